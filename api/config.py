@@ -40,6 +40,15 @@ class Config:
     MAX_RESULT_ROWS: int = int(os.getenv("MAX_RESULT_ROWS", "1000"))
     CONVERSATION_HISTORY_LIMIT: int = int(os.getenv("CONVERSATION_HISTORY_LIMIT", "5"))
     RESULT_SUMMARY_MAX_TOKENS: int = 150
+    # Summarizer fast path: results at or under this row count with flat
+    # columns and simple SQL skip the LLM and use the basic summary
+    FAST_PATH_ROW_LIMIT: int = int(os.getenv("FAST_PATH_ROW_LIMIT", "10"))
+    LLM_SUMMARY_MIN_COMPLEXITY: int = int(os.getenv("LLM_SUMMARY_MIN_COMPLEXITY", "1"))
+    # Micro-batch concurrent summarizations into one LLM call (async path)
+    SUMMARIZER_BATCH_ENABLED: bool = os.getenv("SUMMARIZER_BATCH_ENABLED", "false").lower() == "true"
+    # Reuse previously generated SQL for semantically equivalent queries
+    SQL_SEMANTIC_CACHE_ENABLED: bool = os.getenv("SQL_SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SQL_RE2_ENABLED: bool = os.getenv("SQL_RE2_ENABLED", "false").lower() == "true"
     
     # Confidence Thresholds (lowered to be more responsive)
     DATABRICKS_CONFIDENCE_THRESHOLD: float = float(
@@ -1,42 +1,73 @@
 """
 FastAPI application for AI Workflow - Vercel Serverless Function
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
+import gzip
+import hashlib
+import importlib
 import os
 import time
-import traceback
+from collections import OrderedDict
 
-# Try relative imports first (for Vercel), then absolute (for local)
+import anyio
+import orjson
+
+# Install uvloop before the app (and any event loop) is created - it is a
+# drop-in asyncio policy that roughly doubles throughput on I/O-bound
+# workloads like this one. Optional: not available on Windows dev boxes.
 try:
-    # Vercel deployment - use relative imports
-    from .workflow import get_workflow, create_initial_state
-    from .schema_loader import get_schema_loader
-    from .config import config
-    from .logging_config import init_default_logger, get_logger
+    import uvloop
+    uvloop.install()
 except ImportError:
-    # Local development - use absolute imports
-    import sys
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    parent_dir = os.path.dirname(current_dir)
-    for path in [current_dir, parent_dir]:
-        if path not in sys.path:
-            sys.path.insert(0, path)
-    
-    from workflow import get_workflow, create_initial_state
-    from schema_loader import get_schema_loader
-    from config import config
-    from logging_config import init_default_logger, get_logger
+    pass
+
+# Sibling modules resolve through __package__: as "api.config" when the
+# module runs as a package (Vercel, uvicorn api.index:app) and as plain
+# "config" when run flat from the api/ directory. This replaces the old
+# try/except path gymnastics that mutated sys.path on every cold start.
+# Only the light modules are imported here - the workflow/schema stack
+# transitively pulls LangChain and friends and loads via
+# initialize_system(), called at the bottom of this module during the
+# INIT phase with a lazy retry on the first /query.
+_PKG = __package__ or ""
+
+
+def _import_sibling(name: str):
+    """Import a module from this directory under either layout."""
+    return importlib.import_module(f"{_PKG}.{name}" if _PKG else name)
+
+
+config = _import_sibling("config").config
+_logging_config = _import_sibling("logging_config")
+init_default_logger = _logging_config.init_default_logger
+get_logger = _logging_config.get_logger
+begin_workflow_trace = _logging_config.begin_workflow_trace
+flush_workflow_trace = _logging_config.flush_workflow_trace
 
 # Initialize FastAPI app
+# Guard against the module body being evaluated twice (e.g. a packaging
+# step that concatenates or double-includes the entry point): a second
+# pass would re-register every route and re-initialize the logger. The
+# check must run before the constructor - a re-execution would rebind a
+# fresh app, so only a name left over in globals() can witness the
+# first pass.
+if "app" in globals():
+    raise RuntimeError("api.index evaluated twice - check the build entry points")
+
 app = FastAPI(
     title="AI Workflow API",
     description="Natural language to SQL query API for casino database",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson is several times faster than stdlib json for the row-heavy
+    # /query payloads and handles datetimes natively
+    default_response_class=ORJSONResponse
 )
 
 # Mount static files (if public directory exists)
@@ -44,23 +75,163 @@ public_dir = os.path.join(os.path.dirname(__file__), "public")
 if os.path.exists(public_dir):
     app.mount("/static", StaticFiles(directory=public_dir), name="static")
 
-# Add CORS middleware
+# Compress JSON responses over 1 KB - /query result arrays and /schema
+# are highly compressible. Level 5 keeps the CPU cost negligible. The
+# root page is already gzipped at import and is skipped (the middleware
+# leaves responses that carry a Content-Encoding alone).
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# CORS: the embedded chatbot UI is served from / and is same-origin, so
+# this only matters for external frontends. Set UI_ORIGIN to restrict
+# to a known host (credentials allowed); otherwise fall back to a
+# wildcard without credentials, since credentialed wildcards violate the
+# spec and browsers reject them anyway. max_age lets browsers cache the
+# OPTIONS preflight for a day instead of paying an extra RTT per /query.
+_ui_origin = os.getenv("UI_ORIGIN")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[_ui_origin] if _ui_origin else ["*"],
+    allow_credentials=bool(_ui_origin),
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type"],
+    max_age=86400,
 )
+del _ui_origin
 
 # Initialize logging
 init_default_logger()
 logger = get_logger("ai_workflow.api")
 
-# Global state
+# Global state (populated lazily by initialize_system)
 _workflow = None
 _schema_cache = None
-_conversation_history: Dict[str, List[Dict[str, str]]] = {}  # session_id -> history
+_create_initial_state = None
+_schema_response_bytes = None  # /schema payload, serialized once at init
+
+# Cap the worker threads used for the blocking workflow so concurrent
+# queries can't grow the thread pool (and memory) without bound.
+_blocking_limiter = anyio.CapacityLimiter(min((os.cpu_count() or 1) * 2, 32))
+
+
+class SessionStore:
+    """
+    Conversation-history store safe for concurrent request tasks.
+
+    A plain module dict had two problems: the read-append-slice-assign
+    sequence in /query was a lost-update race between concurrent tasks,
+    and sessions accumulated forever. An OrderedDict-backed LRU bounded
+    at max_sessions (with per-session history capped at max_turns) fixes
+    both; all mutation happens under an asyncio.Lock.
+    """
+
+    def __init__(self, max_sessions: int = 10_000, max_turns: int = 20):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self._sessions: "OrderedDict[str, List[Dict[str, str]]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def get(self, session_id: str) -> List[Dict[str, str]]:
+        """Get a copy of the history for a session (empty list if unknown)."""
+        async with self._lock:
+            return list(self._sessions.get(session_id, []))
+
+    async def append(
+        self,
+        session_id: str,
+        user_msg: Dict[str, str],
+        assistant_msg: Dict[str, str],
+        base: Optional[List[Dict[str, str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Append one user/assistant turn to a session and return the
+        updated history. If `base` is given (client-supplied override),
+        it replaces the stored history before appending.
+        """
+        async with self._lock:
+            if base is not None:
+                history = list(base)
+            else:
+                history = self._sessions.pop(session_id, [])
+
+            history.extend((user_msg, assistant_msg))
+            # Trim in place to the most recent turns
+            del history[:-self.max_turns]
+            self._sessions[session_id] = history
+
+            # Evict the least recently used session beyond the cap
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            return list(history)
+
+    async def clear(self, session_id: str) -> bool:
+        """Drop a session's history. Returns True if it existed."""
+        async with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+
+class RedisSessionStore:
+    """
+    Session store backed by Redis (Vercel KV / Upstash), used when
+    KV_URL is set. Serverless containers don't share memory, so the
+    in-process store loses session continuity whenever a request lands
+    on a different warm instance; Redis gives every container the same
+    view, and the TTL bounds growth instead of an LRU cap.
+
+    Same async get/append/clear surface as SessionStore.
+    """
+
+    def __init__(self, url: str, max_turns: int = 20, ttl_seconds: int = 3600):
+        # Deferred import: redis is only required when KV_URL is set
+        import redis.asyncio as aioredis
+
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self._redis = aioredis.Redis.from_url(url)
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"hist:{session_id}"
+
+    async def get(self, session_id: str) -> List[Dict[str, str]]:
+        """Get the history for a session (empty list if unknown)."""
+        raw = await self._redis.get(self._key(session_id))
+        return orjson.loads(raw) if raw else []
+
+    async def append(
+        self,
+        session_id: str,
+        user_msg: Dict[str, str],
+        assistant_msg: Dict[str, str],
+        base: Optional[List[Dict[str, str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """Append one user/assistant turn and refresh the session TTL."""
+        if base is not None:
+            history = list(base)
+        else:
+            history = await self.get(session_id)
+
+        history.extend((user_msg, assistant_msg))
+        del history[:-self.max_turns]
+
+        await self._redis.set(
+            self._key(session_id), orjson.dumps(history), ex=self.ttl_seconds
+        )
+        return history
+
+    async def clear(self, session_id: str) -> bool:
+        """Drop a session's history. Returns True if it existed."""
+        return bool(await self._redis.delete(self._key(session_id)))
+
+
+_kv_url = os.getenv("KV_URL")
+_session_store = RedisSessionStore(_kv_url) if _kv_url else SessionStore()
+del _kv_url
+
+# In-flight /query calls keyed by (session_id, query). Concurrent
+# identical calls (UI retries, double-clicked send) await the first
+# call's future instead of running the LLM+SQL pipeline again.
+_inflight: Dict[Tuple[str, str], "asyncio.Future"] = {}
 
 
 class QueryRequest(BaseModel):
@@ -70,8 +241,47 @@ class QueryRequest(BaseModel):
     conversation_history: Optional[List[Dict[str, str]]] = None  # Optional override
 
 
+# msgspec decodes schema'd JSON several times faster than Pydantic and
+# skips its per-field Python-level coercion; the /query routes parse the
+# raw body with this decoder and fall back to the Pydantic model when
+# msgspec isn't installed. QueryRequest above stays as the documented
+# request shape.
+try:
+    import msgspec
+
+    class _QueryRequestMsg(msgspec.Struct):
+        query: str
+        session_id: Optional[str] = "default"
+        conversation_history: Optional[List[Dict[str, str]]] = None
+
+    _decode_query_request = msgspec.json.Decoder(_QueryRequestMsg).decode
+except ImportError:
+    msgspec = None
+    _decode_query_request = None
+
+
+async def _parse_query_request(raw_request: Request) -> "QueryRequest":
+    """Parse and validate a /query body (msgspec when available)."""
+    body = await raw_request.body()
+
+    if _decode_query_request is not None:
+        try:
+            return _decode_query_request(body)
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        return QueryRequest.model_validate_json(body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 class QueryResponse(BaseModel):
-    """Response model for query endpoint."""
+    """
+    Shape of the /query payload. Kept for documentation; the endpoint
+    returns a plain dict so FastAPI skips re-validating data our own
+    workflow just produced.
+    """
     response: str
     sql: Optional[str] = None
     results: Optional[List[Dict[str, Any]]] = None
@@ -82,41 +292,68 @@ class QueryResponse(BaseModel):
 
 
 def initialize_system():
-    """Initialize workflow and schema cache."""
-    global _workflow, _schema_cache
-    
+    """Initialize workflow and schema cache (first /query pays this cost)."""
+    global _workflow, _schema_cache, _create_initial_state
+
     if _workflow is None:
         logger.info("Initializing AI Workflow system...")
+
+        # Deferred import of the heavy workflow stack (see module top)
+        workflow_mod = _import_sibling("workflow")
+        get_workflow = workflow_mod.get_workflow
+        create_initial_state = workflow_mod.create_initial_state
+        get_schema_loader = _import_sibling("schema_loader").get_schema_loader
+
         _workflow = get_workflow()
-        
+        _create_initial_state = create_initial_state
+
         schema_loader = get_schema_loader()
         schema_loader.load_casino_schema()
         _schema_cache = schema_loader.to_dict()
-        
+
+        # The /schema payload is immutable after startup - serialize it
+        # once so the endpoint just hands back cached bytes.
+        global _schema_response_bytes
+        _schema_response_bytes = orjson.dumps({
+            "tables": [
+                {
+                    "name": table["full_name"],
+                    "columns": table["columns"],
+                    "description": table.get("description", "")
+                }
+                for table in _schema_cache.get("tables", [])
+            ]
+        })
+
+        _HEALTH_STATIC["tables_cached"] = len(_schema_cache.get("tables", []))
+
         logger.info("✓ System initialized")
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize system on startup."""
-    initialize_system()
+@app.get("/")
+async def root(request: Request):
+    """Root endpoint - serve the chatbot UI (pre-gzipped, with ETag)."""
+    if request.headers.get("if-none-match") == _HTML_ETAG:
+        return Response(status_code=304)
 
+    headers = {
+        "ETag": _HTML_ETAG,
+        "Cache-Control": "public, max-age=300",
+        "Vary": "Accept-Encoding",
+    }
+    # Only send the pre-gzipped body to clients that negotiated it;
+    # health probes and plain curl get the uncompressed bytes.
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        content = _HTML_GZ
+        headers["Content-Encoding"] = "gzip"
+    else:
+        content = _HTML_BYTES
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Root endpoint - serve the chatbot UI."""
-    # Try to read HTML from file first
-    html_path = os.path.join(os.path.dirname(__file__), "public", "index.html")
-    
-    try:
-        if os.path.exists(html_path):
-            with open(html_path, "r", encoding="utf-8") as f:
-                return f.read()
-    except Exception as e:
-        logger.warning(f"Could not read HTML file: {e}")
-    
-    # Return inline chatbot UI
-    return CHATBOT_HTML
+    return Response(
+        content=content,
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
 
 
 # Chatbot HTML template
@@ -239,38 +476,60 @@ function fmt(t){return t?esc(t).replace(/\\*\\*(.*?)\\*\\*/g,'<strong>$1</strong
 </html>"""
 
 
+# Resolve and encode the page once at import: prefer public/index.html if
+# the deployment ships one, else the inline template. The bytes are
+# gzipped ahead of time so every hit is a cached-buffer send, and the
+# ETag lets repeat visitors get a 304 instead of the payload.
+_HTML_PATH = os.path.join(os.path.dirname(__file__), "public", "index.html")
+try:
+    with open(_HTML_PATH, "r", encoding="utf-8") as f:
+        _HTML_SOURCE = f.read()
+except OSError:
+    _HTML_SOURCE = CHATBOT_HTML
+
+_HTML_BYTES = _HTML_SOURCE.encode("utf-8")
+_HTML_GZ = gzip.compress(_HTML_BYTES, 6)
+_HTML_ETAG = '"' + hashlib.blake2b(_HTML_BYTES, digest_size=8).hexdigest() + '"'
+
+
+# Health payload statics - load balancers poll /health constantly, so the
+# API-key derivatives are computed once here instead of per request.
+# tables_cached is filled in by initialize_system() once the schema loads.
+_api_key = config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
+_HEALTH_STATIC = {
+    "openai_configured": bool(_api_key and len(_api_key) > 10),
+    "openai_key_prefix": _api_key[:15] + "..." if _api_key else "NOT SET",
+}
+del _api_key
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    api_key = config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
     return {
         "status": "healthy",
-        "tables_cached": len(_schema_cache.get("tables", [])) if _schema_cache else 0,
-        "openai_configured": bool(api_key and len(api_key) > 10),
-        "openai_key_prefix": api_key[:15] + "..." if api_key else "NOT SET"
+        "tables_cached": _HEALTH_STATIC.get("tables_cached", 0),
+        "openai_configured": _HEALTH_STATIC["openai_configured"],
+        "openai_key_prefix": _HEALTH_STATIC["openai_key_prefix"],
     }
 
 
 @app.get("/schema")
 async def get_schema():
-    """Get database schema information."""
-    if not _schema_cache:
+    """Get database schema information (pre-serialized at init)."""
+    if _schema_response_bytes is None:
         raise HTTPException(status_code=500, detail="Schema not loaded")
-    
-    return {
-        "tables": [
-            {
-                "name": table["full_name"],
-                "columns": table["columns"],
-                "description": table.get("description", "")
-            }
-            for table in _schema_cache.get("tables", [])
-        ]
-    }
+
+    return Response(_schema_response_bytes, media_type="application/json")
 
 
-@app.post("/query", response_model=QueryResponse)
-async def execute_query(request: QueryRequest):
+# No response_model on purpose: the payload was just produced by our own
+# workflow, and FastAPI's outgoing validation/filtering pass is O(rows)
+# over the results list. The dict goes straight to ORJSONResponse; the
+# responses mapping keeps QueryResponse in the OpenAPI docs without
+# making Pydantic validate anything.
+@app.post("/query", responses={200: {"model": QueryResponse}})
+async def execute_query(raw_request: Request, background_tasks: BackgroundTasks):
     """
     Execute a natural language query.
     
@@ -280,90 +539,211 @@ async def execute_query(request: QueryRequest):
     Returns:
         Query response with results and metadata
     """
-    global _conversation_history
-    
+    request = await _parse_query_request(raw_request)
+
     try:
-        # Ensure system is initialized
+        # Ensure system is initialized (schema loading blocks, so off-loop)
         if _workflow is None:
-            initialize_system()
-        
+            await anyio.to_thread.run_sync(initialize_system, limiter=_blocking_limiter)
+
         session_id = request.session_id or "default"
-        
-        # Get or create conversation history for this session
-        if request.conversation_history is not None:
-            # Use provided history (client override)
-            history = request.conversation_history
+
+        # Coalesce concurrent duplicates: if this exact query is already
+        # running for this session, share its result instead of paying
+        # for a second pipeline run.
+        key = (session_id, request.query.strip())
+        inflight = _inflight.get(key)
+
+        if inflight is not None:
+            logger.info("Session %s: joining in-flight identical query", session_id)
+            final_state, execution_time = await inflight
+            history = await _session_store.get(session_id)
         else:
-            # Use server-side history
-            history = _conversation_history.get(session_id, [])
-        
-        logger.info(f"Session {session_id}: Processing query with {len(history)} history items")
-        
-        # Create initial state
-        initial_state = create_initial_state(
-            user_input=request.query,
-            schema_cache=_schema_cache,
-            conversation_history=history
-        )
-        
-        # Execute workflow
-        start_time = time.time()
-        
-        final_state = _workflow.invoke(initial_state)
-        
-        execution_time = time.time() - start_time
-        
+            future = asyncio.get_running_loop().create_future()
+            # Retrieve the exception eagerly so a failure with no joined
+            # waiters doesn't log a "never retrieved" warning.
+            future.add_done_callback(
+                lambda f: f.exception() if not f.cancelled() else None
+            )
+            _inflight[key] = future
+
+            try:
+                # Get or create conversation history for this session
+                if request.conversation_history is not None:
+                    # Use provided history (client override)
+                    history = request.conversation_history
+                else:
+                    # Use server-side history
+                    history = await _session_store.get(session_id)
+
+                logger.info("Session %s: processing query with %d history items", session_id, len(history))
+
+                # Batch the ~12 node entry/exit records for this
+                # request into one trace record, emitted after invoke
+                begin_workflow_trace()
+
+                # Create initial state
+                initial_state = _create_initial_state(
+                    user_input=request.query,
+                    schema_cache=_schema_cache,
+                    conversation_history=history
+                )
+
+                # Execute workflow on a worker thread - invoke() blocks for
+                # seconds on LLM/SQL calls and would otherwise stall the
+                # event loop for every other request. perf_counter_ns is
+                # monotonic (so wall-clock adjustments can't corrupt the
+                # reported execution_time) and avoids the float
+                # conversion until the very end.
+                start_ns = time.perf_counter_ns()
+
+                final_state = await anyio.to_thread.run_sync(
+                    _workflow.invoke, initial_state, limiter=_blocking_limiter
+                )
+
+                execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+                flush_workflow_trace(logger)
+                future.set_result((final_state, execution_time))
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                _inflight.pop(key, None)
+
         # Extract results
         response = final_state.get("response", "No response generated")
         sql = final_state.get("generated_sql")
         results = final_state.get("query_result")
         error = final_state.get("error_message")
         path = final_state.get("current_node", "unknown")
+
+        if inflight is None:
+            # Only the originating request appends the turn - joined
+            # duplicates would double it up. The store write runs after
+            # the response is sent; the payload carries a local echo of
+            # what the store will hold so the client isn't kept waiting
+            # on the persistence step.
+            user_msg = {"role": "user", "content": request.query}
+            assistant_msg = {"role": "assistant", "content": response}
+
+            history = list(history)
+            history.extend((user_msg, assistant_msg))
+            del history[:-_session_store.max_turns]
+
+            background_tasks.add_task(
+                _session_store.append,
+                session_id,
+                user_msg,
+                assistant_msg,
+                request.conversation_history,
+            )
+
+            logger.info("Session %s: history now has %d items", session_id, len(history))
+
+
+        return {
+            "response": response,
+            "sql": sql,
+            "results": results,
+            "execution_time": execution_time,
+            "path_taken": path,
+            "error": error,
+            "conversation_history": history
+        }
         
-        # Update conversation history
-        history.append({"role": "user", "content": request.query})
-        history.append({"role": "assistant", "content": response})
-        
-        # Limit history size to prevent memory bloat
-        if len(history) > 20:
-            history = history[-20:]
-        
-        # Store updated history
-        _conversation_history[session_id] = history
-        
-        logger.info(f"Session {session_id}: History now has {len(history)} items")
-        
-        return QueryResponse(
-            response=response,
-            sql=sql,
-            results=results,
-            execution_time=execution_time,
-            path_taken=path,
-            error=error,
+    except Exception as e:
+        logger.error("Error executing query: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/query/stream")
+async def execute_query_stream(raw_request: Request):
+    """
+    Execute a natural language query, streaming the results as NDJSON.
+
+    The first line is the response preamble (summary, SQL, metadata);
+    every following line is one result row serialized with orjson. This
+    keeps memory flat for large result sets - /query has to materialize
+    and serialize the whole payload in one buffer.
+    """
+    request = await _parse_query_request(raw_request)
+
+    try:
+        # Ensure system is initialized (schema loading blocks, so off-loop)
+        if _workflow is None:
+            await anyio.to_thread.run_sync(initialize_system, limiter=_blocking_limiter)
+
+        session_id = request.session_id or "default"
+
+        if request.conversation_history is not None:
+            history = request.conversation_history
+        else:
+            history = await _session_store.get(session_id)
+
+        initial_state = _create_initial_state(
+            user_input=request.query,
+            schema_cache=_schema_cache,
             conversation_history=history
         )
-        
+
+        begin_workflow_trace()
+        start_ns = time.perf_counter_ns()
+
+        final_state = await anyio.to_thread.run_sync(
+            _workflow.invoke, initial_state, limiter=_blocking_limiter
+        )
+
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+        flush_workflow_trace(logger)
+
+        response = final_state.get("response", "No response generated")
+        results = final_state.get("query_result") or []
+
+        await _session_store.append(
+            session_id,
+            {"role": "user", "content": request.query},
+            {"role": "assistant", "content": response},
+            base=request.conversation_history,
+        )
+
+        preamble = orjson.dumps({
+            "response": response,
+            "sql": final_state.get("generated_sql"),
+            "row_count": len(results),
+            "execution_time": execution_time,
+            "path_taken": final_state.get("current_node", "unknown"),
+            "error": final_state.get("error_message"),
+        })
+
+        def _gen():
+            yield preamble + b"\n"
+            for row in results:
+                # default=str: executor rows carry decimal.Decimal for
+                # DECIMAL columns (and this runs after headers are
+                # sent, where a TypeError would just truncate the
+                # stream instead of surfacing an error)
+                yield orjson.dumps(row, default=str) + b"\n"
+
+        return StreamingResponse(_gen(), media_type="application/x-ndjson")
+
     except Exception as e:
-        logger.error(f"Error executing query: {e}", exc_info=True)
+        logger.error("Error executing streaming query: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/history/{session_id}")
 async def clear_history(session_id: str = "default"):
     """Clear conversation history for a session."""
-    global _conversation_history
-    
-    if session_id in _conversation_history:
-        del _conversation_history[session_id]
+    if await _session_store.clear(session_id):
         return {"status": "cleared", "session_id": session_id}
-    
+
     return {"status": "not_found", "session_id": session_id}
 
 
 @app.get("/history/{session_id}")
 async def get_history(session_id: str = "default"):
     """Get conversation history for a session."""
-    history = _conversation_history.get(session_id, [])
+    history = await _session_store.get(session_id)
     return {
         "session_id": session_id,
         "history": history,
@@ -371,35 +751,48 @@ async def get_history(session_id: str = "default"):
     }
 
 
+# The /examples payload never changes - serialize it once at import
+_EXAMPLES_BYTES = orjson.dumps({
+    "examples": [
+        {
+            "category": "Simple Queries",
+            "queries": [
+                "Show me the first 5 employees",
+                "How many customers are there?",
+                "List all active employees"
+            ]
+        },
+        {
+            "category": "Analytical Queries",
+            "queries": [
+                "Which employees generated the highest revenue per shift?",
+                "What is the average transaction amount per customer?",
+                "How many customers are in each region?"
+            ]
+        },
+        {
+            "category": "Complex Queries",
+            "queries": [
+                "Show high-risk customers who lost more than $5000 in game sessions",
+                "Find customers with the highest problem gambling scores by region",
+                "Which equipment generates the most revenue per hour?"
+            ]
+        }
+    ]
+})
+
+
 @app.get("/examples")
 async def get_examples():
     """Get example queries users can try."""
-    return {
-        "examples": [
-            {
-                "category": "Simple Queries",
-                "queries": [
-                    "Show me the first 5 employees",
-                    "How many customers are there?",
-                    "List all active employees"
-                ]
-            },
-            {
-                "category": "Analytical Queries",
-                "queries": [
-                    "Which employees generated the highest revenue per shift?",
-                    "What is the average transaction amount per customer?",
-                    "How many customers are in each region?"
-                ]
-            },
-            {
-                "category": "Complex Queries",
-                "queries": [
-                    "Show high-risk customers who lost more than $5000 in game sessions",
-                    "Find customers with the highest problem gambling scores by region",
-                    "Which equipment generates the most revenue per hour?"
-                ]
-            }
-        ]
-    }
+    return Response(_EXAMPLES_BYTES, media_type="application/json")
+
 
+# Warm the workflow and schema during module import: on Vercel this runs
+# in the INIT phase, before the container accepts traffic, so the first
+# /query doesn't pay the graph build + schema load. A failure here is
+# logged but not raised - the /query path retries initialization lazily.
+try:
+    initialize_system()
+except Exception:
+    logger.exception("System init at import failed; will retry on first /query")
@@ -7,21 +7,32 @@ Provides structured logging with:
 - File and console handlers
 - Request tracking with correlation IDs
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 import os
+import time
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from typing import Optional
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class StructuredFormatter(logging.Formatter):
     """Custom formatter for structured JSON logging."""
     
     def format(self, record):
         """Format log record as JSON for structured logging."""
+        # orjson serializes datetimes natively, so skip isoformat() there
         log_data = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -40,11 +51,19 @@ class StructuredFormatter(logging.Formatter):
             log_data['request_id'] = record.request_id
         if hasattr(record, 'sql'):
             log_data['sql'] = record.sql
+        if hasattr(record, 'trace'):
+            log_data['trace'] = record.trace
         
         # Add exception info if present
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
-        
+
+        # orjson is 3-6x faster than stdlib json on these small records,
+        # which matters since every log line pays this cost
+        if orjson is not None:
+            return orjson.dumps(log_data, option=orjson.OPT_UTC_Z).decode()
+
+        log_data['timestamp'] = log_data['timestamp'].isoformat()
         return json.dumps(log_data)
 
 
@@ -64,8 +83,49 @@ class ColoredConsoleFormatter(logging.Formatter):
     def format(self, record):
         """Format with colors for console."""
         color = self.COLORS.get(record.levelname, self.RESET)
-        record.levelname = f"{color}{record.levelname}{self.RESET}"
-        return super().format(record)
+        original = record.levelname
+        # Restore the record afterwards - other handlers format the same
+        # record and must not see the ANSI-wrapped levelname
+        record.levelname = f"{color}{original}{self.RESET}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = original
+
+
+class _DropOldestQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops the oldest record instead of blocking when
+    the queue is full - logging must never stall a request thread.
+    """
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+
+
+# Background listener that drains the log queue (started by setup_logging)
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_queue_listener():
+    """Flush and stop the listener thread (registered with atexit)."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
 
 
 def setup_logging(
@@ -99,6 +159,10 @@ def setup_logging(
     
     # Remove existing handlers
     logger.handlers = []
+
+    # Terminal handlers - attached to the queue listener below, not to
+    # the logger itself
+    handlers = []
     
     # Console handler
     if console_output:
@@ -107,14 +171,21 @@ def setup_logging(
         
         if structured:
             console_formatter = StructuredFormatter()
-        else:
+        elif sys.stdout.isatty():
             console_formatter = ColoredConsoleFormatter(
                 '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
                 datefmt='%Y-%m-%d %H:%M:%S'
             )
+        else:
+            # No TTY (serverless, piped output): ANSI codes are wasted
+            # allocations and garbage in the captured logs
+            console_formatter = logging.Formatter(
+                '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
     # File handler
     if log_file:
@@ -136,11 +207,37 @@ def setup_logging(
                 )
             
             file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+
+            # Buffer file writes: one write() syscall per ~1000 records
+            # (or immediately on ERROR) instead of one per record
+            mem_handler = logging.handlers.MemoryHandler(
+                capacity=1000,
+                flushLevel=logging.ERROR,
+                target=file_handler,
+                flushOnClose=True
+            )
+            mem_handler.setLevel(numeric_level)
+            atexit.register(mem_handler.flush)
+            handlers.append(mem_handler)
         except (OSError, PermissionError) as e:
             # Silently skip file logging on read-only filesystems
             print(f"Warning: Could not setup file logging: {e}")
     
+    # Route records through a bounded queue: node handlers only enqueue,
+    # while the listener thread does the formatting and I/O off the
+    # request path.
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+    log_queue = queue.Queue(maxsize=10_000)
+    logger.addHandler(_DropOldestQueueHandler(log_queue))
+
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _queue_listener.start()
+
     return logger
 
 
@@ -157,23 +254,62 @@ def get_logger(name: str = "ai_workflow") -> logging.Logger:
     return logging.getLogger(name)
 
 
-# Request ID tracking for correlation
-_current_request_id: Optional[str] = None
+# Request ID tracking for correlation. A ContextVar instead of a module
+# global: reads are a C-level lookup and the value is scoped per
+# thread/task instead of shared mutable state.
+_request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
 
 def set_request_id(request_id: str):
     """Set the current request ID for tracking."""
-    global _current_request_id
-    _current_request_id = request_id
+    _request_id_var.set(request_id)
 
 
 def get_request_id() -> Optional[str]:
     """Get the current request ID."""
-    return _current_request_id
+    return _request_id_var.get()
+
+
+# Per-request node trace batching. While a trace is active (begun by the
+# API layer), node entry/exit events append to a list instead of each
+# emitting their own record - one request walks ~6 nodes and would
+# otherwise produce a dozen log records.
+_trace_var: ContextVar[Optional[list]] = ContextVar("workflow_trace", default=None)
+
+
+def begin_workflow_trace() -> list:
+    """Start batching node entry/exit events for the current context."""
+    trace = []
+    _trace_var.set(trace)
+    return trace
+
+
+def flush_workflow_trace(logger: logging.Logger):
+    """Emit the batched trace as a single record and stop batching."""
+    trace = _trace_var.get()
+    _trace_var.set(None)
+    if trace:
+        # Render the trace into the message too: the default console
+        # formatter only shows the format string, so leaving the trace
+        # in extra alone would emit a content-free line unless
+        # structured logging is enabled.
+        logger.info(
+            "workflow_trace %s",
+            trace,
+            extra={
+                'trace': trace,
+                'request_id': get_request_id()
+            }
+        )
 
 
 def log_node_entry(logger: logging.Logger, node_name: str, state: dict):
     """Log entry into a node."""
+    trace = _trace_var.get()
+    if trace is not None:
+        trace.append((node_name, "enter", time.perf_counter()))
+        return
+    
     logger.info(
         f"Entering node: {node_name}",
         extra={
@@ -181,11 +317,19 @@ def log_node_entry(logger: logging.Logger, node_name: str, state: dict):
             'request_id': get_request_id()
         }
     )
-    logger.debug(f"State keys: {list(state.keys())}")
+    # Guarded: building the key list on every node boundary is wasted
+    # work when DEBUG is filtered out
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("State keys: %s", list(state.keys()))
 
 
 def log_node_exit(logger: logging.Logger, node_name: str, updates: dict):
     """Log exit from a node."""
+    trace = _trace_var.get()
+    if trace is not None:
+        trace.append((node_name, "exit", time.perf_counter()))
+        return
+    
     logger.info(
         f"Exiting node: {node_name}",
         extra={
@@ -211,6 +355,8 @@ def log_routing_decision(logger: logging.Logger, from_node: str, to_node: str, r
 
 def log_llm_call(logger: logging.Logger, model: str, prompt_tokens: int = None):
     """Log an LLM call."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug(
         f"LLM call: {model}",
         extra={
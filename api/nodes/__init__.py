@@ -2,7 +2,10 @@
 Node package initialization.
 Exports all node classes and functions for easy importing.
 """
-try:
+# Branch on __package__ up front instead of try/except: the old pattern
+# attempted all eight relative imports, unwound on the failure, and then
+# redid the whole set absolutely - wasted work on every cold start.
+if __package__:
     # Relative imports for Vercel
     from .supervisor import SupervisorNode, supervisor_node
     from .conversation import ConversationResponder, conversation_node
@@ -12,7 +15,7 @@ try:
     from .sql_validator import SQLValidator, sql_validator_node
     from .casino_api_executor import CasinoAPIExecutor, casino_api_executor_node
     from .result_summarizer import ResultSummarizer, result_summarizer_node
-except ImportError:
+else:
     # Absolute imports for local development
     from nodes.supervisor import SupervisorNode, supervisor_node
     from nodes.conversation import ConversationResponder, conversation_node
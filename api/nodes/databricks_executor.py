@@ -11,8 +11,14 @@ from typing import Dict, Any, List, Optional
 from state import WorkflowState
 from config import config
 from logging_config import get_logger, log_node_entry, log_node_exit, log_sql_execution, log_error
+import atexit
+import threading
 import time
 
+# Bound once at import - logging.getLogger is a lock + dict lookup we
+# don't need to repeat per instance
+_LOGGER = get_logger("ai_workflow.databricks_executor")
+
 
 class DatabricksExecutor:
     """
@@ -25,7 +31,8 @@ class DatabricksExecutor:
     def __init__(self):
         self.connection = None
         self.cursor = None
-        self.logger = get_logger("ai_workflow.databricks_executor")
+        self.logger = _LOGGER
+        self._lock = threading.Lock()
         self._init_connection()
     
     def _init_connection(self):
@@ -35,23 +42,31 @@ class DatabricksExecutor:
     
     def _get_cursor(self):
         """Get or create a database cursor with connection pooling."""
+        # Lock-free fast path once the connection is up; double-checked
+        # locking below so concurrent worker threads can't race the
+        # check-then-assign and build two connections.
+        cursor = self.cursor
+        if cursor is not None:
+            return cursor
+        
         try:
             from databricks import sql
             
-            if not self.connection:
-                self.connection = sql.connect(
-                    server_hostname=config.DATABRICKS_SERVER_HOSTNAME,
-                    http_path=config.DATABRICKS_HTTP_PATH,
-                    access_token=config.DATABRICKS_ACCESS_TOKEN,
-                    # Connection pool settings
-                    _connection_timeout=5,
-                    _socket_timeout=config.DATABRICKS_QUERY_TIMEOUT,
-                )
-            
-            if not self.cursor:
-                self.cursor = self.connection.cursor()
-            
-            return self.cursor
+            with self._lock:
+                if not self.connection:
+                    self.connection = sql.connect(
+                        server_hostname=config.DATABRICKS_SERVER_HOSTNAME,
+                        http_path=config.DATABRICKS_HTTP_PATH,
+                        access_token=config.DATABRICKS_ACCESS_TOKEN,
+                        # Connection pool settings
+                        _connection_timeout=5,
+                        _socket_timeout=config.DATABRICKS_QUERY_TIMEOUT,
+                    )
+                
+                if not self.cursor:
+                    self.cursor = self.connection.cursor()
+                
+                return self.cursor
             
         except ImportError:
             raise RuntimeError("databricks-sql-connector not installed")
@@ -71,17 +86,17 @@ class DatabricksExecutor:
         log_node_entry(self.logger, "DatabricksExecutor", state)
         
         sql = state.get("generated_sql", "")
-        self.logger.info(f"Executing SQL query...")
-        self.logger.debug(f"SQL: {sql}")
+        self.logger.info("Executing SQL query...")
+        self.logger.debug("SQL: %s", sql)
         
         # Execute query
         result = self._execute_query(sql)
         
         if result.get("error"):
-            self.logger.error(f"Query execution failed: {result['error']}")
+            self.logger.error("Query execution failed: %s", result["error"])
         else:
             row_count = len(result.get("data", []))
-            self.logger.info(f"Query executed successfully: {row_count} rows returned")
+            self.logger.info("Query executed successfully: %d rows returned", row_count)
         
         updates = {
             "query_result": result.get("data"),
@@ -103,27 +118,33 @@ class DatabricksExecutor:
                 "execution_time": float
             }
         """
-        start_time = time.time()
+        # perf_counter_ns: monotonic, and integer math until the end
+        start_ns = time.perf_counter_ns()
         
         try:
             self.logger.debug("Getting database cursor...")
             cursor = self._get_cursor()
             
-            self.logger.debug(f"Executing query with timeout: {config.DATABRICKS_QUERY_TIMEOUT}s")
+            self.logger.debug("Executing query with timeout: %ss", config.DATABRICKS_QUERY_TIMEOUT)
             # Execute with timeout
             cursor.execute(sql)
             
-            # Fetch results with limit
-            rows = cursor.fetchmany(config.MAX_RESULT_ROWS)
-            
-            # Convert to list of dicts
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                data = [dict(zip(columns, row)) for row in rows]
+            # Fetch results with limit. Prefer the connector's Arrow
+            # path (databricks-sql-connector >= 3.0): the batch arrives
+            # columnar and to_pylist() builds the row dicts in one
+            # C-level pass instead of a zip + dict per row.
+            if hasattr(cursor, "fetchmany_arrow"):
+                data = cursor.fetchmany_arrow(config.MAX_RESULT_ROWS).to_pylist()
             else:
-                data = []
+                rows = cursor.fetchmany(config.MAX_RESULT_ROWS)
+                if rows:
+                    # Tuple of column names built once, reused per row
+                    columns = tuple(desc[0] for desc in cursor.description)
+                    data = [dict(zip(columns, row)) for row in rows]
+                else:
+                    data = []
             
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
             
             log_sql_execution(self.logger, sql, execution_time, len(data))
             
@@ -134,7 +155,7 @@ class DatabricksExecutor:
             }
             
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
             
             log_error(self.logger, e, "Query execution")
             
@@ -160,14 +181,26 @@ class DatabricksExecutor:
                 pass
             self.connection = None
     
-    def __del__(self):
-        """Cleanup on deletion."""
-        self.close()
+
+# Process-wide executor: rebuilding one per invocation threw away the
+# pooled connection and paid the Databricks handshake + TLS cost on
+# every request. Cleanup happens via atexit rather than __del__, which
+# is unreliable during interpreter shutdown.
+_SINGLETON: Optional[DatabricksExecutor] = None
+_SINGLETON_LOCK = threading.Lock()
 
 
 # Convenience function for LangGraph
 def databricks_executor_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for query execution."""
-    node = DatabricksExecutor()
-    return node(state)
+    global _SINGLETON
+    # Double-checked locking, same as _get_cursor: node invocations run
+    # on worker threads, so two concurrent first requests could both
+    # see None and each open a Databricks connection.
+    if _SINGLETON is None:
+        with _SINGLETON_LOCK:
+            if _SINGLETON is None:
+                _SINGLETON = DatabricksExecutor()
+                atexit.register(_SINGLETON.close)
+    return _SINGLETON(state)
 
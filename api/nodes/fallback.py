@@ -13,6 +13,40 @@ except ImportError:
     from state import WorkflowState
     from logging_config import get_logger, log_node_entry, log_node_exit
 
+# Bound once at import - logging.getLogger is a lock + dict lookup we
+# don't need to repeat per instance
+_LOGGER = get_logger("ai_workflow.fallback")
+
+# Static template segments, built once at import: the handler joins the
+# one or two dynamic values between them instead of rebuilding the same
+# multi-line strings on every error.
+_EXEC_ERR_TPL = (
+    "❌ **Query Execution Error**\n\n",
+    "\n\n**Generated SQL:**\n```sql\n",
+    "\n```\n\nThe database returned an error. Please try rephrasing your question.",
+)
+_NO_RESULTS_TPL = (
+    "📊 **No Results Found**\n\n"
+    "The query executed successfully but returned no matching records.\n\n"
+    "**Generated SQL:**\n```sql\n",
+    "\n```\n\nTry lowering thresholds or removing some filters.",
+)
+_PROCESSING_ERR_TPL = (
+    "❌ **Query Processing Error**\n\n"
+    "An unexpected error occurred while processing the query.\n\n"
+    "**Generated SQL:**\n```sql\n",
+    "\n```",
+)
+_SQL_GEN_ERR_TPL = (
+    "❌ **SQL Generation Error**\n\n",
+    "\n\nPlease try rephrasing your question.",
+)
+_GENERIC_ERR_PREFIX = "❌ **Error**\n\n"
+_UNKNOWN_ERR_TPL = (
+    "❌ **Unable to process query**\n\nYour query: ",
+    "\n\nPlease try rephrasing or simplifying your question.",
+)
+
 
 class FallbackClarifier:
     """
@@ -21,7 +55,7 @@ class FallbackClarifier:
     """
     
     def __init__(self):
-        self.logger = get_logger("ai_workflow.fallback")
+        self.logger = _LOGGER
     
     def __call__(self, state: WorkflowState) -> Dict[str, Any]:
         """
@@ -40,44 +74,33 @@ class FallbackClarifier:
         if generated_sql and not generated_sql.startswith("-- Error"):
             if error_message:
                 # SQL was generated but execution failed
-                response = (
-                    f"❌ **Query Execution Error**\n\n"
-                    f"{error_message}\n\n"
-                    f"**Generated SQL:**\n```sql\n{generated_sql}\n```\n\n"
-                    f"The database returned an error. Please try rephrasing your question."
-                )
+                response = "".join((
+                    _EXEC_ERR_TPL[0], error_message,
+                    _EXEC_ERR_TPL[1], generated_sql, _EXEC_ERR_TPL[2],
+                ))
             elif query_result is not None and len(query_result) == 0:
                 # Query ran but returned no results
-                response = (
-                    f"📊 **No Results Found**\n\n"
-                    f"The query executed successfully but returned no matching records.\n\n"
-                    f"**Generated SQL:**\n```sql\n{generated_sql}\n```\n\n"
-                    f"Try lowering thresholds or removing some filters."
-                )
+                response = "".join((
+                    _NO_RESULTS_TPL[0], generated_sql, _NO_RESULTS_TPL[1],
+                ))
             else:
                 # SQL generated but unknown issue
-                response = (
-                    f"❌ **Query Processing Error**\n\n"
-                    f"An unexpected error occurred while processing the query.\n\n"
-                    f"**Generated SQL:**\n```sql\n{generated_sql}\n```"
-                )
+                response = "".join((
+                    _PROCESSING_ERR_TPL[0], generated_sql, _PROCESSING_ERR_TPL[1],
+                ))
         elif generated_sql and generated_sql.startswith("-- Error"):
             # SQL generation itself failed
-            response = (
-                f"❌ **SQL Generation Error**\n\n"
-                f"{generated_sql}\n\n"
-                f"Please try rephrasing your question."
-            )
+            response = "".join((
+                _SQL_GEN_ERR_TPL[0], generated_sql, _SQL_GEN_ERR_TPL[1],
+            ))
         elif error_message:
             # Generic error
-            response = f"❌ **Error**\n\n{error_message}"
+            response = _GENERIC_ERR_PREFIX + error_message
         else:
             # Unknown error
-            response = (
-                f"❌ **Unable to process query**\n\n"
-                f"Your query: {user_input[:200]}\n\n"
-                f"Please try rephrasing or simplifying your question."
-            )
+            response = "".join((
+                _UNKNOWN_ERR_TPL[0], user_input[:200], _UNKNOWN_ERR_TPL[1],
+            ))
         
         updates = {
             "response": response,
@@ -88,9 +111,16 @@ class FallbackClarifier:
         return updates
 
 
+# Process-wide clarifier, created on first use (same pattern as the
+# executor singleton)
+_FALLBACK = None
+
+
 # Convenience function for LangGraph
 def fallback_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for fallback."""
-    node = FallbackClarifier()
-    return node(state)
+    global _FALLBACK
+    if _FALLBACK is None:
+        _FALLBACK = FallbackClarifier()
+    return _FALLBACK(state)
 
@@ -4,6 +4,7 @@ Schema Feasibility Checker - Always marks data queries as feasible.
 This node is LENIENT - it almost always marks queries as feasible.
 Let the SQL generator and database handle the actual validation.
 """
+from types import MappingProxyType
 from typing import Dict, Any, List
 import time
 import re
@@ -16,6 +17,21 @@ except ImportError:
     from logging_config import get_logger, log_node_entry, log_node_exit
 
 
+# Keyword map frozen at import: every instance shares one immutable
+# structure instead of rebuilding the literal per construction.
+_TABLE_KEYWORDS = MappingProxyType({
+    "hr_casino.employees": frozenset(["employee", "staff", "worker", "hire", "salary", "department", "position"]),
+    "marketing_casino.customer": frozenset(["customer", "client", "member", "user", "age", "gender", "region"]),
+    "marketing_casino.customer_behaviors": frozenset(["behavior", "gambling", "betting", "risk", "problem", "score", "online", "offline"]),
+    "finance_casino.transactions": frozenset(["transaction", "payment", "deposit", "withdrawal", "amount", "money", "finance"]),
+    "operations_casino.game_sessions": frozenset(["session", "game", "bet", "win", "loss", "play", "gaming"]),
+    "operations_casino.gaming_equipment": frozenset(["equipment", "machine", "slot", "device"]),
+    "operations_casino.shifts": frozenset(["shift", "schedule", "revenue", "work"]),
+})
+_GENERIC_KEYWORDS = frozenset({"show", "list", "get", "find", "display"})
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
 class SchemaFeasibilityChecker:
     """
     Checks if a query is feasible using simple keyword matching.
@@ -26,16 +42,12 @@ class SchemaFeasibilityChecker:
     def __init__(self):
         self.logger = get_logger("ai_workflow.schema_feasibility")
         
-        # Keywords that map to specific tables
-        self.table_keywords = {
-            "hr_casino.employees": ["employee", "staff", "worker", "hire", "salary", "department", "position"],
-            "marketing_casino.customer": ["customer", "client", "member", "user", "age", "gender", "region"],
-            "marketing_casino.customer_behaviors": ["behavior", "gambling", "betting", "risk", "problem", "score", "online", "offline"],
-            "finance_casino.transactions": ["transaction", "payment", "deposit", "withdrawal", "amount", "money", "finance"],
-            "operations_casino.game_sessions": ["session", "game", "bet", "win", "loss", "play", "gaming"],
-            "operations_casino.gaming_equipment": ["equipment", "machine", "slot", "device"],
-            "operations_casino.shifts": ["shift", "schedule", "revenue", "work"]
-        }
+        # Shared immutable keyword map; the input is tokenized once and
+        # intersected at C speed. A naive plural fold keeps
+        # "employees"/"transactions" matching their singular keywords,
+        # and tokenization adds word boundaries ("customer" no longer
+        # hits "customerservice").
+        self.table_keywords = _TABLE_KEYWORDS
     
     def __call__(self, state: WorkflowState) -> Dict[str, Any]:
         """
@@ -50,8 +62,9 @@ class SchemaFeasibilityChecker:
         log_node_entry(self.logger, "SchemaFeasibilityChecker", state)
         start_time = time.time()
         
-        user_input = state.get("user_input", "")
-        schema_cache = state.get("schema_cache", {})
+        get = state.get
+        user_input = get("user_input", "")
+        schema_cache = get("schema_cache", {})
         
         self.logger.info(f"Checking feasibility for query: '{user_input}'")
         
@@ -82,21 +95,20 @@ class SchemaFeasibilityChecker:
         
         BE VERY LENIENT - default to feasible.
         """
-        user_input_lower = user_input.lower()
-        matched_tables = []
-        
-        # Check each table's keywords against user input
-        for table_name, keywords in self.table_keywords.items():
-            for keyword in keywords:
-                if keyword in user_input_lower:
-                    if table_name not in matched_tables:
-                        matched_tables.append(table_name)
-                    break
+        # Tokenize once, fold trailing plurals, then set-intersect
+        tokens = set(_TOKEN_RE.findall(user_input.lower()))
+        tokens.update(t[:-1] for t in tuple(tokens) if t.endswith("s"))
         
+        matched_tables = [
+            table_name
+            for table_name, keywords in _TABLE_KEYWORDS.items()
+            if tokens & keywords
+        ]
+
         # If no specific tables matched, try to infer from generic keywords
         if not matched_tables:
             # Check for generic data keywords
-            if any(kw in user_input_lower for kw in ['show', 'list', 'get', 'find', 'display']):
+            if tokens & _GENERIC_KEYWORDS:
                 # Default to employees table for generic queries
                 matched_tables = ["hr_casino.employees"]
         
@@ -109,8 +121,12 @@ class SchemaFeasibilityChecker:
         }
 
 
+# Process-wide checker, created once at import (same pattern as the
+# executor singleton; construction is cheap but not free per request)
+_CHECKER = SchemaFeasibilityChecker()
+
+
 # Convenience function for LangGraph
 def schema_feasibility_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for schema feasibility checking."""
-    node = SchemaFeasibilityChecker()
-    return node(state)
+    return _CHECKER(state)
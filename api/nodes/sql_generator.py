@@ -4,30 +4,65 @@ SQL Generator - Generates high-precision SQL queries.
 Takes the user's query and schema information to generate
 safe, optimized SQL that follows strict rules.
 """
+from collections import OrderedDict
 from typing import Dict, Any, List
+import asyncio
 import re
 import time
 import os
+import atexit
+import tempfile
 import requests
 import json
+from requests.adapters import HTTPAdapter
 
+# numpy ships as a langchain dependency; the semantic cache degrades to
+# a no-op if it is somehow unavailable
 try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# orjson (Rust) encodes request bodies and decodes responses several
+# times faster than stdlib json; degrade transparently without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Branch on the package context up front instead of try/except: the
+# old pattern attempted all four relative imports, unwound the
+# ImportError, and redid the whole set absolutely on every flat import
+# (same rationale as nodes/__init__). ".." needs a parent package, so
+# check for one directly rather than probing with an exception.
+if __package__ and "." in __package__:
+    # Relative imports for Vercel
     from ..state import WorkflowState
     from ..utils import sanitize_sql
     from ..logging_config import get_logger, log_node_entry, log_node_exit
     from ..config import config
-except ImportError:
+else:
+    # Absolute imports for local development
     from state import WorkflowState
     from utils import sanitize_sql
     from logging_config import get_logger, log_node_entry, log_node_exit
     from config import config
 
+# Optional DFA regex engine (google-re2). No backtracking, so batch
+# post-processing over large eval sets gets linear-time matching and no
+# pathological worst cases. Off by default: the stdlib engine is fine
+# at request volume, and re2 is not a hard dependency.
+if config.SQL_RE2_ENABLED:
+    try:
+        import re2 as re  # noqa: F811
+    except ImportError:
+        pass
 
-# Complete schema reference for the LLM
-CASINO_SCHEMA = """
-COMPLETE DATABASE SCHEMA:
 
-1. hr_casino.employees
+# Per-table schema docs, keyed by qualified name. The full-schema
+# prompt and the per-query slice are both assembled from these.
+TABLE_DOCS = {
+    "hr_casino.employees": """1. hr_casino.employees
    Columns:
    - employee_id (INTEGER) - Primary key
    - first_name, last_name (VARCHAR) - Employee name
@@ -35,9 +70,8 @@ COMPLETE DATABASE SCHEMA:
    - position (VARCHAR) - Job title
    - hire_date (DATE) - When hired
    - salary (DECIMAL) - Annual salary
-   - is_active (INTEGER) - 1 = active, 0 = inactive
-
-2. marketing_casino.customer
+   - is_active (INTEGER) - 1 = active, 0 = inactive""",
+    "marketing_casino.customer": """2. marketing_casino.customer
    Columns:
    - customer_id (TEXT/VARCHAR) - Primary key
    - customer_name (VARCHAR) - Full name
@@ -48,9 +82,8 @@ COMPLETE DATABASE SCHEMA:
    - employment_status (TEXT) - Employee, Self-employed, Unemployed, Student, Other
    - education_level (TEXT) - Primary, Secondary, Bachelor, Master, PhD
    - registration_date (TIMESTAMP) - When registered
-   - risk_score (BIGINT) - Risk score 0-100
-
-3. marketing_casino.customer_behaviors
+   - risk_score (BIGINT) - Risk score 0-100""",
+    "marketing_casino.customer_behaviors": """3. marketing_casino.customer_behaviors
    Columns:
    - behavior_id (BIGINT) - Primary key
    - customer_id (TEXT) - Foreign key to customer
@@ -60,9 +93,8 @@ COMPLETE DATABASE SCHEMA:
    - monthly_gambling_expenditure_offline (REAL) - Monthly offline spending
    - monthly_gambling_expenditure_online (REAL) - Monthly online spending
    - problem_gambling_score (REAL) - Problem gambling score
-   - risk_level (TEXT) - 'low', 'medium', or 'high'
-
-4. finance_casino.transactions
+   - risk_level (TEXT) - 'low', 'medium', or 'high'""",
+    "finance_casino.transactions": """4. finance_casino.transactions
    Columns:
    - transaction_id (INTEGER) - Primary key
    - customer_id (VARCHAR) - Foreign key to customer
@@ -70,9 +102,8 @@ COMPLETE DATABASE SCHEMA:
    - transaction_type (VARCHAR) - Type of transaction
    - transaction_amount (TEXT) - MUST CAST to DECIMAL before math operations
    - status (VARCHAR) - 'APPROVED' or 'DECLINED'
-   - direction (VARCHAR) - 'IN' or 'OUT'
-
-5. operations_casino.game_sessions
+   - direction (VARCHAR) - 'IN' or 'OUT'""",
+    "operations_casino.game_sessions": """5. operations_casino.game_sessions
    Columns:
    - session_id (INTEGER) - Primary key
    - game_id (INTEGER) - Game type
@@ -81,75 +112,40 @@ COMPLETE DATABASE SCHEMA:
    - total_bets (DECIMAL) - Total bets placed
    - total_wins (DECIMAL) - Total wins
    - net_result (DECIMAL) - total_wins - total_bets (negative = loss, positive = win)
-   - session_duration_minutes (INTEGER) - Duration in minutes
-
-6. operations_casino.gaming_equipment
+   - session_duration_minutes (INTEGER) - Duration in minutes""",
+    "operations_casino.gaming_equipment": """6. operations_casino.gaming_equipment
    Columns:
    - equipment_id (INTEGER) - Primary key
    - equipment_name (VARCHAR) - Equipment name
    - equipment_type (VARCHAR) - table/machine/terminal
    - status (VARCHAR) - active/maintenance/inactive
-   - hourly_revenue (DECIMAL) - Average hourly revenue
-
-7. operations_casino.shifts
+   - hourly_revenue (DECIMAL) - Average hourly revenue""",
+    "operations_casino.shifts": """7. operations_casino.shifts
    Columns:
    - shift_id (INTEGER) - Primary key
    - employee_id (INTEGER) - Foreign key to employees
    - equipment_id (INTEGER) - Foreign key to gaming_equipment
    - shift_start (TIMESTAMP) - Shift start time
    - total_revenue (DECIMAL) - Revenue during shift
-   - total_transactions (INTEGER) - Number of transactions
-
-CRITICAL RULES:
-- transaction_amount is TEXT - ALWAYS use CAST(transaction_amount AS DECIMAL) before SUM/AVG/MAX/MIN
-- net_result is DECIMAL - negative values = losses, positive = wins
-- monthly_gambling_expenditure columns are REAL - NO CAST needed
-- risk_level values: 'low', 'medium', 'high' (use single quotes)
-- participation columns: 1 = yes, 0 = no
-- NEVER nest aggregations like AVG(SUM(...)) - this is INVALID SQL
-"""
+   - total_transactions (INTEGER) - Number of transactions""",
+}
 
 
-class SQLGenerator:
-    """
-    Generates production-ready SQL from natural language queries.
-    """
-    
-    def __init__(self):
-        self.logger = get_logger("ai_workflow.sql_generator")
-        # Strip any whitespace/newlines from API key
-        api_key = config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
-        self.api_key = api_key.strip() if api_key else ""
-    
-    def __call__(self, state: WorkflowState) -> Dict[str, Any]:
-        """
-        Generate SQL from user query.
-        """
-        log_node_entry(self.logger, "SQLGenerator", state)
-        start_time = time.time()
-        
-        user_input = state.get("user_input", "")
-        
-        self.logger.info(f"Generating SQL for: '{user_input}'")
-        
-        # Generate SQL
-        sql = self._generate_sql(user_input)
-        
-        execution_time = time.time() - start_time
-        self.logger.info(f"Generated SQL in {execution_time:.3f}s: {sql[:200]}...")
-        
-        updates = {
-            "generated_sql": sql,
-            "current_node": "sql_generator"
-        }
-        
-        log_node_exit(self.logger, "SQLGenerator", updates)
-        return updates
-    
-    def _generate_sql(self, user_input: str) -> str:
-        """Generate SQL query using OpenAI API via requests."""
-        
-        system_prompt = f"""You are an expert PostgreSQL SQL generator. Generate ONLY the SQL query, nothing else.
+# Complete schema reference for the LLM (declaration-order join of
+# TABLE_DOCS; byte-for-byte the schema text the prompt always used)
+CASINO_SCHEMA = (
+    "\nCOMPLETE DATABASE SCHEMA:\n\n" + "\n\n".join(TABLE_DOCS.values()) + "\n"
+)
+
+
+# Static prompt prefix, frozen at import. OpenAI's automatic prompt
+# caching needs a byte-identical prefix (>=1024 tokens) across calls,
+# so the rules/examples/mappings come first and the (possibly sliced)
+# schema is appended after them. Table selection keeps declaration
+# order, so queries hitting the same tables produce byte-identical
+# prompts (each comfortably above the 1024-token caching floor) and
+# still cache against each other. Never add per-call interpolation here.
+_PROMPT_STATIC = """You are an expert PostgreSQL SQL generator. Generate ONLY the SQL query, nothing else.
 
 ABSOLUTE RULES:
 1. Use schema.table format: hr_casino.employees, marketing_casino.customer, etc.
@@ -164,58 +160,14 @@ ABSOLUTE RULES:
    - Example: "risk_level = 'high'" goes in WHERE, NOT HAVING
 7. For multiple WHERE conditions, use AND/OR properly
 
-{CASINO_SCHEMA}
-
-QUERY PATTERNS AND EXAMPLES:
+EXAMPLES:
 
-Pattern 1: Simple queries
 "Show me 5 employees" →
 SELECT employee_id, first_name, last_name, department, position, salary
 FROM hr_casino.employees
 LIMIT 5;
 
-Pattern 2: Aggregations with HAVING
-"Find customers with transactions > $10,000" →
-SELECT c.customer_name, SUM(CAST(t.transaction_amount AS DECIMAL)) AS total_transactions
-FROM marketing_casino.customer c
-JOIN finance_casino.transactions t ON c.customer_id = t.customer_id
-GROUP BY c.customer_name
-HAVING SUM(CAST(t.transaction_amount AS DECIMAL)) > 10000
-ORDER BY total_transactions DESC
-LIMIT 100;
-
-Pattern 3: Multiple conditions with aggregations
-"Find high-risk customers with transactions > $10,000 and losses > $5,000" →
-SELECT c.customer_name, c.region, cb.problem_gambling_score,
-       SUM(CAST(t.transaction_amount AS DECIMAL)) AS total_transaction_amount,
-       SUM(gs.net_result) AS total_net_losses
-   FROM marketing_casino.customer c
-   JOIN marketing_casino.customer_behaviors cb ON c.customer_id = cb.customer_id
-JOIN finance_casino.transactions t ON c.customer_id = t.customer_id
-JOIN operations_casino.game_sessions gs ON c.customer_id = gs.customer_id
-   WHERE cb.risk_level = 'high'
-GROUP BY c.customer_name, c.region, cb.problem_gambling_score
-HAVING SUM(CAST(t.transaction_amount AS DECIMAL)) > 10000 
-   AND SUM(gs.net_result) < -5000
-ORDER BY total_net_losses DESC
-   LIMIT 100;
-
-Pattern 4: Average calculations with WHERE filters (NO nested aggregations!)
-"Top regions by average monthly gambling expenditure for customers 25-35 with both online and offline" →
-SELECT c.region,
-       AVG(cb.monthly_gambling_expenditure_offline + cb.monthly_gambling_expenditure_online) AS average_expenditure,
-       COUNT(DISTINCT c.customer_id) AS customer_count
-FROM marketing_casino.customer c
-JOIN marketing_casino.customer_behaviors cb ON c.customer_id = cb.customer_id
-WHERE c.age BETWEEN 25 AND 35
-  AND cb.online_gambling_participation = 1
-  AND cb.offline_gambling_participation = 1
-GROUP BY c.region
-ORDER BY average_expenditure DESC
-LIMIT 5;
-
-Pattern 4b: WHERE for non-aggregated filters, HAVING for aggregated filters
-"Top 3 regions where customers aged 20-30 have highest average monthly gambling expenditure (online + offline), 
+"Top 3 regions where customers aged 20-30 have highest average monthly gambling expenditure (online + offline),
 with both online/offline participation, at least 5 transactions, and risk_level = 'high'" →
 SELECT c.region,
        AVG(cb.monthly_gambling_expenditure_offline + cb.monthly_gambling_expenditure_online) AS average_expenditure,
@@ -233,26 +185,6 @@ HAVING COUNT(t.transaction_id) >= 5
 ORDER BY average_expenditure DESC
 LIMIT 3;
 
-IMPORTANT COLUMN NOTES:
-- For "average monthly gambling expenditure" use: AVG(cb.monthly_gambling_expenditure_offline + cb.monthly_gambling_expenditure_online)
-- NEVER use "total_expenditure" - this column does NOT exist
-- NEVER use "ft.total_expenditure" - this column does NOT exist  
-- Monthly expenditure columns are in customer_behaviors table (cb), NOT in transactions table (ft/t)
-- The finance_casino.transactions table has: transaction_id, customer_id, transaction_amount, status, direction
-- Use COUNT(t.transaction_id) >= N for "at least N transactions"
-
-Pattern 5: Time-based filtering
-"Employees with highest revenue per shift in last month" →
-SELECT e.employee_id, e.first_name, e.last_name,
-       AVG(s.total_revenue) AS avg_revenue_per_shift,
-       COUNT(s.shift_id) AS total_shifts
-   FROM hr_casino.employees e
-   JOIN operations_casino.shifts s ON e.employee_id = s.employee_id
-WHERE s.shift_start >= CURRENT_DATE - INTERVAL '1 month'
-   GROUP BY e.employee_id, e.first_name, e.last_name
-   ORDER BY avg_revenue_per_shift DESC
-   LIMIT 10;
-
 KEY MAPPINGS:
 - "high-risk" = risk_level = 'high' OR risk_score > 70
 - "participated in both online and offline" = online_gambling_participation = 1 AND offline_gambling_participation = 1
@@ -260,57 +192,518 @@ KEY MAPPINGS:
 - "lost more than $X" = net_result < -X (net_result is already negative for losses)
 - "totaling more than $X" = SUM(CAST(transaction_amount AS DECIMAL)) > X
 - "average monthly expenditure" = AVG(monthly_gambling_expenditure_offline + monthly_gambling_expenditure_online)
+- "at least N transactions" = HAVING COUNT(t.transaction_id) >= N
 - "top N" = ORDER BY ... DESC LIMIT N
 - "per X" = GROUP BY X
 
-CRITICAL RULES FOR WHERE vs HAVING:
-- WHERE clause: Filter individual rows BEFORE grouping
-  - Use for: age, risk_level, participation flags, status, etc.
-  - Example: WHERE cb.risk_level = 'high' AND c.age BETWEEN 20 AND 30
-- HAVING clause: Filter aggregated results AFTER grouping
-  - Use ONLY for: SUM(...) > X, COUNT(...) >= Y, AVG(...) > Z
-  - Example: HAVING SUM(CAST(t.transaction_amount AS DECIMAL)) > 15000
-- NEVER put non-aggregated columns in HAVING unless they're also in GROUP BY
-- If you need to filter by risk_level, age, participation, etc., use WHERE, NOT HAVING!
+COLUMN NOTES:
+- "total_expenditure" does NOT exist in any table - monthly expenditure columns live in customer_behaviors (cb), NOT transactions (t/ft)
+- finance_casino.transactions has only: transaction_id, customer_id, req_time_utc, transaction_type, transaction_amount, status, direction"""
+
+
+def _build_system_prompt(schema: str) -> str:
+    """Assemble the prompt: static prefix, then the schema for this call."""
+    return f"{_PROMPT_STATIC}\n{schema}\nGenerate the SQL query now:"
+
+
+# Full-schema prompt, used whenever a per-query slice isn't available
+# (async path, embeddings unavailable, retrieval failure)
+_SYSTEM_PROMPT = _build_system_prompt(CASINO_SCHEMA)
+
+# Shared full-schema system message for paths that don't slice the
+# schema. Never mutate - every request payload references this dict.
+_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_PROMPT}
+
+
+
+class SemanticSQLCache:
+    """
+    Embedding-keyed cache for generated SQL.
+
+    Equivalent phrasings ("top 5 employees" / "show me 5 employees")
+    should resolve to the same SQL. A text-embedding-3-small lookup is an
+    order of magnitude cheaper and faster than a chat completion, and a
+    hit skips the completion entirely. Entries carry a TTL, the store is
+    bounded, and the cache persists best-effort to the temp dir so warm
+    serverless instances keep their hits across restarts.
+    """
+
+    EMBED_MODEL = "text-embedding-3-small"
+    SIM_THRESHOLD = 0.92
+    MAX_ENTRIES = 256
+    TTL_SECONDS = 3600
+    PERSIST_PATH = os.path.join(tempfile.gettempdir(), "sql_semantic_cache.json")
+
+    def __init__(self, api_key: str, logger):
+        self.api_key = api_key
+        self.logger = logger
+        self._entries = []  # (timestamp, embedding, sql)
+        self._load()
+
+    def lookup(self, user_input: str):
+        """
+        Return (embedding, cached_sql_or_None). The embedding is handed
+        back so a subsequent store() doesn't re-embed on a miss.
+        """
+        vec = self._embed(user_input)
+        if vec is None:
+            return None, None
+
+        now = time.time()
+        self._entries = [e for e in self._entries if now - e[0] < self.TTL_SECONDS]
+        if not self._entries:
+            return vec, None
+
+        matrix = np.stack([e[1] for e in self._entries])
+        sims = matrix @ vec / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(vec) + 1e-9)
+        best = int(sims.argmax())
+        if sims[best] > self.SIM_THRESHOLD:
+            # Refresh recency so hot entries outlive the LRU eviction
+            _, best_vec, sql = self._entries.pop(best)
+            self._entries.append((now, best_vec, sql))
+            self.logger.info(f"Semantic SQL cache hit (similarity {sims[best]:.3f})")
+            return vec, sql
+        return vec, None
+
+    def store(self, vec, sql: str) -> None:
+        """Insert a freshly generated SQL, evicting the oldest entry."""
+        self._entries.append((time.time(), vec, sql))
+        if len(self._entries) > self.MAX_ENTRIES:
+            del self._entries[0]
+        self._save()
+
+    def _embed(self, text: str):
+        """Embed the input; None on any failure (cache becomes a no-op)."""
+        try:
+            response = _SESSION.post(
+                "https://api.openai.com/v1/embeddings",
+                headers=_HEADERS,
+                data=_json_dumps({"model": self.EMBED_MODEL, "input": text}),
+                timeout=10
+            )
+            if response.status_code != 200:
+                return None
+            return np.asarray(
+                _json_loads(response.content)["data"][0]["embedding"], dtype=np.float32
+            )
+        except Exception:
+            return None
+
+    def _load(self) -> None:
+        # JSON rather than pickle: the temp-dir path is predictable on
+        # a shared host, and unpickling a file another local user could
+        # pre-create would execute arbitrary code. JSON only yields data.
+        try:
+            with open(self.PERSIST_PATH, "rb") as f:
+                raw = _json_loads(f.read())
+            self._entries = [
+                (ts, np.asarray(vec, dtype=np.float32), sql)
+                for ts, vec, sql in raw
+            ]
+        except Exception:
+            self._entries = []
+
+    def _save(self) -> None:
+        try:
+            raw = [[ts, vec.tolist(), sql] for ts, vec, sql in self._entries]
+            with open(self.PERSIST_PATH, "wb") as f:
+                f.write(_json_dumps(raw))
+        except Exception:
+            # Read-only filesystem etc. - persistence is best-effort
+            pass
+
+
+# Post-processing regexes compiled once at import; the HAVING fixer in
+# particular runs several of these per generated statement.
+_RE_SQL_FENCE = re.compile(r'```sql\s*(.*?)\s*```', re.DOTALL | re.IGNORECASE)
+_RE_CODE_FENCE = re.compile(r'```\s*(.*?)\s*```', re.DOTALL)
+_RE_NESTED_AGG = re.compile(r'AVG\s*\(\s*SUM\s*\(', re.IGNORECASE)
+_RE_NESTED_AGG_SUB = re.compile(r'AVG\s*\(\s*SUM\s*\(([^)]+)\)\s*\)', re.IGNORECASE)
+_RE_HAVING = re.compile(r'\bHAVING\b')
+_RE_WHERE = re.compile(r'\bWHERE\b')
+_RE_GROUP_BY = re.compile(r'\bGROUP\s+BY\b')
+_RE_ORDER_BY = re.compile(r'\bORDER\s+BY\b', re.IGNORECASE)
+_RE_LIMIT = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+_RE_AGG_OPEN = re.compile(r'\b(SUM|COUNT|AVG|MAX|MIN)\s*\([^)]*$', re.IGNORECASE)
+_RE_DOUBLE_AND = re.compile(r'\s+AND\s+AND\s+', re.IGNORECASE)
+_RE_LEADING_AND = re.compile(r'^\s+AND\s+', re.IGNORECASE)
+# Row-level conditions that belong in WHERE, not HAVING - one combined
+# alternation so the clause is scanned once for all of them
+_RE_HAVING_MOVABLE = re.compile(
+    r'\s+AND\s+(?P<cond>'
+    r'\w+\.risk_level\s*=\s*[\'"][^\'"]+[\'"]'
+    r'|\w+\.age\s+BETWEEN\s+\d+\s+AND\s+\d+'
+    r'|\w+\.(?:online|offline)_gambling_participation\s*=\s*\d+'
+    r')',
+    re.IGNORECASE,
+)
+
+
+def _limit(n: str) -> int:
+    """Clamp a user-supplied row count to the prompt's LIMIT rules."""
+    return min(int(n), 1000)
+
+
+# Template router: inputs that map deterministically onto the example
+# patterns in the system prompt get hand-written SQL without an API
+# call at all. Patterns are fully anchored and deliberately narrow -
+# anything that doesn't match exactly falls through to the LLM.
+# (pattern, match -> SQL); matched against the stripped, lowered input.
+_TEMPLATES = [
+    (
+        re.compile(r'(?:show|list|get)\s+(?:me\s+)?(?:the\s+)?(?:top\s+|first\s+)?(\d+)\s+employees[?.!]?'),
+        lambda m: (
+            "SELECT employee_id, first_name, last_name, department, position, salary\n"
+            "FROM hr_casino.employees\n"
+            f"LIMIT {_limit(m[1])};"
+        ),
+    ),
+    (
+        re.compile(r'(?:show|list|get)\s+(?:me\s+)?(?:the\s+)?(?:top\s+|first\s+)?(\d+)\s+customers[?.!]?'),
+        lambda m: (
+            "SELECT customer_id, customer_name, gender, age, region, risk_score\n"
+            "FROM marketing_casino.customer\n"
+            f"LIMIT {_limit(m[1])};"
+        ),
+    ),
+    (
+        re.compile(r'how\s+many\s+customers(?:\s+are\s+there)?[?.!]?'),
+        lambda m: (
+            "SELECT COUNT(*) AS customer_count\n"
+            "FROM marketing_casino.customer\n"
+            "LIMIT 1;"
+        ),
+    ),
+    (
+        re.compile(r'how\s+many\s+employees(?:\s+are\s+there)?[?.!]?'),
+        lambda m: (
+            "SELECT COUNT(*) AS employee_count\n"
+            "FROM hr_casino.employees\n"
+            "LIMIT 1;"
+        ),
+    ),
+    (
+        re.compile(r'(?:show|list|get)\s+(?:me\s+)?(?:all\s+)?(?:the\s+)?gaming\s+equipment[?.!]?'),
+        lambda m: (
+            "SELECT equipment_id, equipment_name, equipment_type, status, hourly_revenue\n"
+            "FROM operations_casino.gaming_equipment\n"
+            "LIMIT 100;"
+        ),
+    ),
+    (
+        re.compile(r'top\s+(\d+)\s+regions\s+by\s+average\s+monthly\s+gambling\s+expenditure[?.!]?'),
+        lambda m: (
+            "SELECT c.region,\n"
+            "       AVG(cb.monthly_gambling_expenditure_offline + cb.monthly_gambling_expenditure_online) AS average_expenditure,\n"
+            "       COUNT(DISTINCT c.customer_id) AS customer_count\n"
+            "FROM marketing_casino.customer c\n"
+            "JOIN marketing_casino.customer_behaviors cb ON c.customer_id = cb.customer_id\n"
+            "GROUP BY c.region\n"
+            "ORDER BY average_expenditure DESC\n"
+            f"LIMIT {_limit(m[1])};"
+        ),
+    ),
+]
+
+
+def _match_template(user_input: str):
+    """Return hand-written SQL for trivially matched inputs, else None."""
+    text = user_input.strip().lower()
+    for pattern, build in _TEMPLATES:
+        match = pattern.fullmatch(text)
+        if match:
+            return build(match)
+    return None
+
+
+_RE_FROM = re.compile(r'\bFROM\b', re.IGNORECASE)
+
+
+def _sql_fatal_error(sql: str):
+    """
+    Cheap local sanity checks on post-processed SQL. Returns a short
+    problem description for the repair prompt, or None when the
+    statement looks executable. Deliberately shallow - the point is to
+    catch output the downstream validator would bounce anyway.
+    """
+    stripped = sql.strip()
+    head = stripped.lstrip("(").upper()
+    if not (head.startswith("SELECT") or head.startswith("WITH")):
+        return "statement does not start with SELECT or WITH"
+    if stripped.count("(") != stripped.count(")"):
+        return "unbalanced parentheses"
+    if stripped.count("'") % 2:
+        return "unterminated string literal"
+    if _RE_NESTED_AGG.search(stripped):
+        return "nested aggregation like AVG(SUM(...)) is invalid"
+    if not _RE_FROM.search(stripped):
+        return "missing FROM clause"
+    return None
+
+
+# Targeted repair: when post-processing can't patch the statement, one
+# short repair call (tiny prompt, no schema) is far cheaper than the
+# full-prompt regeneration the fallback path would otherwise trigger.
+_REPAIR_SYSTEM_PROMPT = (
+    "You are an expert PostgreSQL SQL fixer. You are given a broken SQL "
+    "statement and the problem detected in it. Return ONLY the corrected "
+    "SQL statement, nothing else."
+)
+_REPAIR_STATS = {"attempts": 0, "successes": 0}
+
+
+def _repair_payload(sql: str, error: str) -> dict:
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": _REPAIR_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Problem: {error}\n\nSQL:\n{sql}"},
+        ],
+        "max_tokens": _MAX_TOKENS_RETRY,
+        "temperature": 0.0,
+    }
+
+
+# Typical generated SQL runs ~100-250 output tokens; start with a tight
+# cap and retry once with the old ceiling only when a completion is
+# actually cut off (finish_reason == "length")
+_MAX_TOKENS_DEFAULT = 300
+_MAX_TOKENS_RETRY = 600
+
+
+class _OpenAIError(RuntimeError):
+    """Non-200 response from the OpenAI API."""
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize a request body with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data):
+    """Parse a response body (bytes or str) with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# One pooled session per process: the TCP+TLS handshake to
+# api.openai.com (~100-300ms) is paid once per connection instead of on
+# every call. Session keeps connections alive by default.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+atexit.register(_SESSION.close)
+
+
+# Shared async client for the async node path; one pool per process,
+# closed at exit like the sync session. Lazy so sync-only deployments
+# never build it.
+_ASYNC_CLIENT = None
+
+
+def _get_async_client():
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        import httpx
+
+        _ASYNC_CLIENT = httpx.AsyncClient(timeout=30)
+    return _ASYNC_CLIENT
+
+
+# Exact-match LRU in front of the semantic cache: duplicate query
+# strings (UI refresh loops) short-circuit before even the embedding
+# call. Only successful generations are stored, so transient API errors
+# get retried instead of pinned - the reason this is an OrderedDict
+# rather than functools.lru_cache on the method.
+_EXACT_SQL_CACHE = OrderedDict()
+_EXACT_SQL_CACHE_MAX = 1024
+_EXACT_SQL_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+# Shared cache instance (embeddings are per-process; the JSON file
+# carries them across cold starts)
+_SEMANTIC_CACHE = None
+
+
+def _get_semantic_cache(api_key: str, logger):
+    """Build the shared semantic cache, or None when it can't work."""
+    global _SEMANTIC_CACHE
+    if np is None or not api_key or not config.SQL_SEMANTIC_CACHE_ENABLED:
+        return None
+    if _SEMANTIC_CACHE is None:
+        _SEMANTIC_CACHE = SemanticSQLCache(api_key, logger)
+    return _SEMANTIC_CACHE
+
+
+# Per-table embeddings for schema slicing: most queries touch 1-3
+# tables, so the prompt carries the top-k relevant DDL blocks instead
+# of all 7. Built lazily from the semantic cache's embedding endpoint
+# and persisted best-effort alongside the cache JSON.
+_SCHEMA_TOP_K = 4
+_TABLE_EMBED_PATH = os.path.join(tempfile.gettempdir(), "schema_table_embeddings.json")
+_TABLE_EMBEDS = None
+
+
+def _get_table_embeddings(cache):
+    """name -> embedding for every table, or None until they can be built."""
+    global _TABLE_EMBEDS
+    if _TABLE_EMBEDS is not None:
+        return _TABLE_EMBEDS
+    # JSON, not pickle - see SemanticSQLCache._load
+    try:
+        with open(_TABLE_EMBED_PATH, "rb") as f:
+            loaded = _json_loads(f.read())
+        if set(loaded) == set(TABLE_DOCS):
+            _TABLE_EMBEDS = {
+                name: np.asarray(vec, dtype=np.float32)
+                for name, vec in loaded.items()
+            }
+            return _TABLE_EMBEDS
+    except Exception:
+        pass
+    embeds = {}
+    for name, doc in TABLE_DOCS.items():
+        vec = cache._embed(f"{name}\n{doc}")
+        if vec is None:
+            # Embedding endpoint unavailable - retry on a later call
+            return None
+        embeds[name] = vec
+    _TABLE_EMBEDS = embeds
+    try:
+        with open(_TABLE_EMBED_PATH, "wb") as f:
+            f.write(_json_dumps({name: vec.tolist() for name, vec in embeds.items()}))
+    except Exception:
+        pass
+    return _TABLE_EMBEDS
+
+
+def _schema_slice(query_vec, cache, logger):
+    """
+    The top-k table docs for this query, or the full schema when
+    retrieval can't run. Selected tables keep declaration order so
+    equivalent queries produce byte-identical prompts.
+    """
+    if query_vec is None or cache is None:
+        return CASINO_SCHEMA
+    embeds = _get_table_embeddings(cache)
+    if embeds is None:
+        return CASINO_SCHEMA
+    names = list(TABLE_DOCS)
+    matrix = np.stack([embeds[n] for n in names])
+    sims = matrix @ query_vec / (
+        np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vec) + 1e-9
+    )
+    top = sorted(np.argsort(sims)[-_SCHEMA_TOP_K:].tolist())
+    logger.info(f"Schema slice: {[names[i] for i in top]}")
+    docs = [TABLE_DOCS[names[i]] for i in top]
+    return "\nRELEVANT TABLES:\n\n" + "\n\n".join(docs) + "\n"
+
 
-OTHER CRITICAL RULES:
-- NEVER use AVG(SUM(...)) - this is INVALID SQL
-- Always CAST transaction_amount to DECIMAL before SUM/AVG
-- monthly_gambling_expenditure columns are REAL - no CAST needed
-- Use proper JOIN syntax with table aliases
+# API key resolved and stripped once at import; instances just bind it.
+_API_KEY = (config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "") or "").strip()
 
-Generate the SQL query now:"""
+# One headers dict for every OpenAI call, built once. Mutated in place
+# by _refresh_api_key so existing references pick up a rotated key.
+_HEADERS = {
+    "Authorization": f"Bearer {_API_KEY}",
+    "Content-Type": "application/json",
+}
+
+
+def _refresh_api_key() -> str:
+    """Re-read the key from config/env (for tests and key rotation)."""
+    global _API_KEY
+    _API_KEY = (config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "") or "").strip()
+    _HEADERS["Authorization"] = f"Bearer {_API_KEY}"
+    return _API_KEY
+
+
+class SQLGenerator:
+    """
+    Generates production-ready SQL from natural language queries.
+    """
+    
+    def __init__(self):
+        self.logger = get_logger("ai_workflow.sql_generator")
+        self.api_key = _API_KEY
+    
+    def __call__(self, state: WorkflowState) -> Dict[str, Any]:
+        """
+        Generate SQL from user query.
+        """
+        log_node_entry(self.logger, "SQLGenerator", state)
+        start_time = time.time()
+        
+        user_input = state.get("user_input", "")
+        
+        self.logger.info(f"Generating SQL for: '{user_input}'")
+        
+        # Generate SQL
+        sql = self._generate_sql(user_input)
+        
+        execution_time = time.time() - start_time
+        self.logger.info(f"Generated SQL in {execution_time:.3f}s: {sql[:200]}...")
+        
+        updates = {
+            "generated_sql": sql,
+            "current_node": "sql_generator"
+        }
+        
+        log_node_exit(self.logger, "SQLGenerator", updates)
+        return updates
+    
+    def _generate_sql(self, user_input: str) -> str:
+        """Generate SQL query using OpenAI API via requests."""
+        
+        # Template router first: trivially matched inputs get
+        # hand-written SQL with no API call at all
+        templated = _match_template(user_input)
+        if templated is not None:
+            self.logger.info("Template match - LLM skipped")
+            return templated
+        
+        # Exact-match cache next: identical strings skip everything
+        cached = _EXACT_SQL_CACHE.get(user_input)
+        if cached is not None:
+            _EXACT_SQL_CACHE.move_to_end(user_input)
+            _EXACT_SQL_CACHE_STATS["hits"] += 1
+            self.logger.info(
+                "Exact SQL cache hit (%(hits)d hits / %(misses)d misses)",
+                _EXACT_SQL_CACHE_STATS,
+            )
+            return cached
+        _EXACT_SQL_CACHE_STATS["misses"] += 1
+        
+        # Then the semantic cache: equivalent phrasings reuse previous SQL
+        cache = _get_semantic_cache(self.api_key, self.logger)
+        embedding = None
+        if cache is not None:
+            embedding, cached_sql = cache.lookup(user_input)
+            if cached_sql is not None:
+                return cached_sql
+        
+        # Reuse the lookup embedding to slice the schema; the static
+        # prompt prefix stays byte-identical call to call either way
+        system_prompt = _build_system_prompt(
+            _schema_slice(embedding, cache, self.logger)
+        )
         
         try:
             self.logger.info(f"Calling OpenAI API...")
             
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"Generate SQL for: {user_input}"}
-                    ],
-                    "max_tokens": 600,
-                    "temperature": 0.2
-                },
-                timeout=30
+            sql, finish_reason = self._stream_completion(
+                user_input, _MAX_TOKENS_DEFAULT, system_prompt
             )
-            
-            self.logger.info(f"OpenAI response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                error_text = response.text
-                self.logger.error(f"OpenAI API error: {error_text}")
-                return f"-- Error: OpenAI API returned {response.status_code}: {error_text[:200]}"
-            
-            data = response.json()
-            sql = data["choices"][0]["message"]["content"].strip()
+            if finish_reason == "length":
+                self.logger.warning(
+                    f"Completion cut off at {_MAX_TOKENS_DEFAULT} tokens, retrying with {_MAX_TOKENS_RETRY}"
+                )
+                sql, finish_reason = self._stream_completion(
+                    user_input, _MAX_TOKENS_RETRY, system_prompt
+                )
+            sql = sql.strip()
             
             self.logger.info(f"OpenAI response: {sql[:150]}...")
             
@@ -320,8 +713,27 @@ Generate the SQL query now:"""
             # Post-process
             sql = self._post_process_sql(sql)
             
+            # Fatally broken output gets one targeted repair call
+            # instead of being handed broken to the validator
+            error = _sql_fatal_error(sql)
+            if error is not None:
+                sql = self._repair_sql(sql, error)
+                error = _sql_fatal_error(sql)
+            
+            # Never cache SQL that is still broken - a retry should
+            # regenerate rather than replay the failure
+            if error is None:
+                _EXACT_SQL_CACHE[user_input] = sql
+                if len(_EXACT_SQL_CACHE) > _EXACT_SQL_CACHE_MAX:
+                    _EXACT_SQL_CACHE.popitem(last=False)
+                if cache is not None and embedding is not None:
+                    cache.store(embedding, sql)
+            
             return sql
             
+        except _OpenAIError as e:
+            self.logger.error(f"OpenAI API error: {e}")
+            return f"-- Error: {e}"
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Request error: {e}")
             return f"-- Error: Request failed: {str(e)}"
@@ -331,17 +743,289 @@ Generate the SQL query now:"""
             self.logger.error(f"Error: {e}\n{error_details}")
             return f"-- Error generating SQL: {type(e).__name__}: {str(e)}"
     
+    def _stream_completion(self, user_input: str, max_tokens: int, system_prompt: str = _SYSTEM_PROMPT):
+        """
+        POST a streaming completion and return (content, finish_reason).
+
+        Streaming lets us stop reading as soon as a statement terminator
+        lands outside a string literal instead of waiting for the full
+        completion. Raises _OpenAIError on non-200 responses.
+        """
+        with _SESSION.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers=_HEADERS,
+            data=_json_dumps({
+                "model": "gpt-4o-mini",
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Generate SQL for: {user_input}"}
+                ],
+                "max_tokens": max_tokens,
+                "temperature": 0.2,
+                "stream": True,
+                "stream_options": {"include_usage": True}
+            }),
+            timeout=30,
+            stream=True
+        ) as response:
+            self.logger.info(f"OpenAI response status: {response.status_code}")
+            if response.status_code != 200:
+                error_text = response.text
+                self.logger.error(f"OpenAI API error: {error_text}")
+                raise _OpenAIError(
+                    f"OpenAI API returned {response.status_code}: {error_text[:200]}"
+                )
+            
+            parts = []
+            finish_reason = None
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data: "):
+                    continue
+                payload = line[6:]
+                if payload == b"[DONE]":
+                    break
+                chunk = _json_loads(payload)
+                
+                # The final chunk carries usage when include_usage is set
+                usage = chunk.get("usage")
+                if usage:
+                    cached_tokens = usage.get("prompt_tokens_details", {}).get("cached_tokens")
+                    if cached_tokens is not None:
+                        self.logger.info(
+                            f"Prompt cache: {cached_tokens}/{usage.get('prompt_tokens')} input tokens cached"
+                        )
+                
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                choice = choices[0]
+                finish_reason = choice.get("finish_reason") or finish_reason
+                delta = choice.get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    # Early exit: a terminating ";" outside a string
+                    # literal means the statement is complete
+                    if ";" in delta:
+                        text = "".join(parts)
+                        if text.rstrip().endswith(";") and text.count("'") % 2 == 0:
+                            finish_reason = finish_reason or "stop"
+                            break
+            
+            return "".join(parts), finish_reason
+    
+    def _repair_sql(self, sql: str, error: str) -> str:
+        """One targeted repair completion; returns the input on failure."""
+        _REPAIR_STATS["attempts"] += 1
+        self.logger.warning(f"Generated SQL failed sanity check ({error}), attempting repair")
+        try:
+            response = _SESSION.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers=_HEADERS,
+                data=_json_dumps(_repair_payload(sql, error)),
+                timeout=30
+            )
+            if response.status_code != 200:
+                return sql
+            fixed = _json_loads(response.content)["choices"][0]["message"]["content"].strip()
+            fixed = self._post_process_sql(self._extract_sql(fixed))
+        except Exception as e:
+            self.logger.error(f"SQL repair call failed: {e}")
+            return sql
+        if _sql_fatal_error(fixed) is None:
+            _REPAIR_STATS["successes"] += 1
+            self.logger.info(
+                "SQL repair succeeded (%(successes)d/%(attempts)d)", _REPAIR_STATS
+            )
+            return fixed
+        return sql
+    
+    async def _arepair_sql(self, sql: str, error: str) -> str:
+        """Async twin of _repair_sql using the shared httpx client."""
+        _REPAIR_STATS["attempts"] += 1
+        self.logger.warning(f"Generated SQL failed sanity check ({error}), attempting repair")
+        try:
+            response = await _get_async_client().post(
+                "https://api.openai.com/v1/chat/completions",
+                headers=_HEADERS,
+                content=_json_dumps(_repair_payload(sql, error))
+            )
+            if response.status_code != 200:
+                return sql
+            fixed = _json_loads(response.content)["choices"][0]["message"]["content"].strip()
+            fixed = self._post_process_sql(self._extract_sql(fixed))
+        except Exception as e:
+            self.logger.error(f"SQL repair call failed: {e}")
+            return sql
+        if _sql_fatal_error(fixed) is None:
+            _REPAIR_STATS["successes"] += 1
+            self.logger.info(
+                "SQL repair succeeded (%(successes)d/%(attempts)d)", _REPAIR_STATS
+            )
+            return fixed
+        return sql
+    
+    async def acall(self, state: WorkflowState) -> Dict[str, Any]:
+        """
+        Async counterpart of __call__. Awaiting the completion lets
+        concurrent graph runs overlap their API waits instead of
+        serializing on the blocking session.
+        """
+        log_node_entry(self.logger, "SQLGenerator", state)
+        start_time = time.time()
+        
+        user_input = state.get("user_input", "")
+        
+        self.logger.info(f"Generating SQL for: '{user_input}'")
+        
+        sql = await self._agenerate_sql(user_input)
+        
+        execution_time = time.time() - start_time
+        self.logger.info(f"Generated SQL in {execution_time:.3f}s: {sql[:200]}...")
+        
+        updates = {
+            "generated_sql": sql,
+            "current_node": "sql_generator"
+        }
+        
+        log_node_exit(self.logger, "SQLGenerator", updates)
+        return updates
+    
+    async def _agenerate_sql(self, user_input: str) -> str:
+        """
+        Async variant of _generate_sql using the shared httpx client.
+
+        Shares the exact-match cache with the sync path; the semantic
+        cache is skipped here because its embedding call is blocking.
+        """
+        templated = _match_template(user_input)
+        if templated is not None:
+            self.logger.info("Template match - LLM skipped")
+            return templated
+        
+        cached = _EXACT_SQL_CACHE.get(user_input)
+        if cached is not None:
+            _EXACT_SQL_CACHE.move_to_end(user_input)
+            _EXACT_SQL_CACHE_STATS["hits"] += 1
+            self.logger.info(
+                "Exact SQL cache hit (%(hits)d hits / %(misses)d misses)",
+                _EXACT_SQL_CACHE_STATS,
+            )
+            return cached
+        _EXACT_SQL_CACHE_STATS["misses"] += 1
+        
+        try:
+            self.logger.info(f"Calling OpenAI API...")
+            
+            for max_tokens in (_MAX_TOKENS_DEFAULT, _MAX_TOKENS_RETRY):
+                response = await _get_async_client().post(
+                    "https://api.openai.com/v1/chat/completions",
+                    headers=_HEADERS,
+                    content=_json_dumps({
+                        "model": "gpt-4o-mini",
+                        "messages": [
+                            _SYSTEM_MSG,
+                            {"role": "user", "content": f"Generate SQL for: {user_input}"}
+                        ],
+                        "max_tokens": max_tokens,
+                        "temperature": 0.2
+                    })
+                )
+                
+                self.logger.info(f"OpenAI response status: {response.status_code}")
+                
+                if response.status_code != 200:
+                    error_text = response.text
+                    self.logger.error(f"OpenAI API error: {error_text}")
+                    return f"-- Error: OpenAI API returned {response.status_code}: {error_text[:200]}"
+                
+                data = _json_loads(response.content)
+                choice = data["choices"][0]
+                sql = choice["message"]["content"].strip()
+                if choice.get("finish_reason") != "length":
+                    break
+                self.logger.warning(
+                    f"Completion cut off at {max_tokens} tokens, retrying with a higher limit"
+                )
+            
+            usage = data.get("usage", {})
+            cached_tokens = usage.get("prompt_tokens_details", {}).get("cached_tokens")
+            if cached_tokens is not None:
+                self.logger.info(
+                    f"Prompt cache: {cached_tokens}/{usage.get('prompt_tokens')} input tokens cached"
+                )
+            
+            sql = self._extract_sql(sql)
+            sql = self._post_process_sql(sql)
+            
+            error = _sql_fatal_error(sql)
+            if error is not None:
+                sql = await self._arepair_sql(sql, error)
+                error = _sql_fatal_error(sql)
+            
+            if error is None:
+                _EXACT_SQL_CACHE[user_input] = sql
+                if len(_EXACT_SQL_CACHE) > _EXACT_SQL_CACHE_MAX:
+                    _EXACT_SQL_CACHE.popitem(last=False)
+            
+            return sql
+            
+        except Exception as e:
+            self.logger.error(f"Request error: {e}", exc_info=True)
+            return f"-- Error: Request failed: {type(e).__name__}: {str(e)}"
+    
+    async def generate_many(self, inputs: List[str], concurrency: int = 10) -> List[str]:
+        """
+        Generate SQL for a batch of inputs with bounded concurrency.
+
+        For eval and demo runs over hundreds of queries: duplicates are
+        collapsed before dispatch (and every call still goes through
+        the template router and caches), up to `concurrency` requests
+        are in flight at once, and rate-limited calls back off
+        exponentially before retrying. Results come back in input order.
+        """
+        unique = list(dict.fromkeys(inputs))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def one(text: str) -> str:
+            async with semaphore:
+                sql = await self._agenerate_sql(text)
+                for delay in (1, 2, 4):
+                    if not sql.startswith("-- Error: OpenAI API returned 429"):
+                        break
+                    self.logger.warning(f"Rate limited, backing off {delay}s")
+                    await asyncio.sleep(delay)
+                    sql = await self._agenerate_sql(text)
+                return sql
+        
+        results = await asyncio.gather(*(one(text) for text in unique))
+        by_input = dict(zip(unique, results))
+        return [by_input[text] for text in inputs]
+    
+    def generate_many_sync(self, inputs: List[str], concurrency: int = 10) -> List[str]:
+        """Blocking wrapper around generate_many for scripts.
+        
+        Must be called from a context with no running event loop.
+        """
+        return asyncio.run(self.generate_many(inputs, concurrency))
+    
     def _extract_sql(self, text: str) -> str:
         """Extract SQL from response."""
-        sql_match = re.search(r'```sql\s*(.*?)\s*```', text, re.DOTALL | re.IGNORECASE)
+        sql_match = _RE_SQL_FENCE.search(text)
         if sql_match:
             return sql_match.group(1).strip()
         
-        code_match = re.search(r'```\s*(.*?)\s*```', text, re.DOTALL)
+        code_match = _RE_CODE_FENCE.search(text)
         if code_match:
             return code_match.group(1).strip()
         
-        return text.strip()
+        text = text.strip()
+        # Streamed responses can stop on the terminating semicolon
+        # before a closing fence arrives, leaving an opening ```sql /
+        # ``` with no close that the fence regexes above won't match -
+        # strip the dangling marker so the SQL itself remains
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1].strip() if "\n" in text else ""
+        return text
     
     def _post_process_sql(self, sql: str) -> str:
         """Clean and validate SQL, fixing common issues."""
@@ -349,9 +1033,9 @@ Generate the SQL query now:"""
         
         # Fix common issues
         # Remove nested aggregations if present
-        if re.search(r'AVG\s*\(\s*SUM\s*\(', sql, re.IGNORECASE):
+        if _RE_NESTED_AGG.search(sql):
             self.logger.warning("Detected invalid nested aggregation AVG(SUM(...)), attempting to fix...")
-            sql = re.sub(r'AVG\s*\(\s*SUM\s*\(([^)]+)\)\s*\)', r'AVG(\1)', sql, flags=re.IGNORECASE)
+            sql = _RE_NESTED_AGG_SUB.sub(r'AVG(\1)', sql)
         
         # Fix: Move non-aggregated column filters from HAVING to WHERE
         # This prevents "column must appear in GROUP BY" errors
@@ -384,13 +1068,13 @@ Generate the SQL query now:"""
         if "HAVING" not in sql_upper:
             return sql
         
-        having_match = re.search(r'\bHAVING\b', sql_upper)
+        having_match = _RE_HAVING.search(sql_upper)
         if not having_match:
             return sql
         
         # Find WHERE and GROUP BY positions
-        where_match = re.search(r'\bWHERE\b', sql_upper)
-        group_by_match = re.search(r'\bGROUP\s+BY\b', sql_upper)
+        where_match = _RE_WHERE.search(sql_upper)
+        group_by_match = _RE_GROUP_BY.search(sql_upper)
         
         if not where_match or not group_by_match:
             return sql
@@ -400,8 +1084,8 @@ Generate the SQL query now:"""
         having_content = sql[having_start:]
         
         # Find where HAVING clause ends
-        order_by_match = re.search(r'\bORDER\s+BY\b', having_content, re.IGNORECASE)
-        limit_match = re.search(r'\bLIMIT\b', having_content, re.IGNORECASE)
+        order_by_match = _RE_ORDER_BY.search(having_content)
+        limit_match = _RE_LIMIT.search(having_content)
         if order_by_match:
             having_end = having_start + order_by_match.start()
         elif limit_match:
@@ -411,51 +1095,65 @@ Generate the SQL query now:"""
         
         having_clause = sql[having_start:having_end].strip()
         
-        # Patterns to find and move to WHERE
-        patterns_to_move = [
-            (r'\s+AND\s+(\w+\.risk_level\s*=\s*[\'"][^\'"]+[\'"])', 'risk_level'),
-            (r'\s+AND\s+(\w+\.age\s+BETWEEN\s+\d+\s+AND\s+\d+)', 'age'),
-            (r'\s+AND\s+(\w+\.(online|offline)_gambling_participation\s*=\s*\d+)', 'participation'),
-        ]
-        
+        # Single pass: collect every movable condition and rebuild the
+        # clause once, instead of one scan + splice per pattern
         moved_conditions = []
+        kept_parts = []
+        last_end = 0
+        for match in _RE_HAVING_MOVABLE.finditer(having_clause):
+            # Skip matches inside an aggregate function call
+            if _RE_AGG_OPEN.search(having_clause[:match.start()]):
+                continue
+            condition = match.group('cond')
+            moved_conditions.append(condition)
+            kept_parts.append(having_clause[last_end:match.start()])
+            last_end = match.end()
+            self.logger.warning(f"🔧 Found row-level condition in HAVING: {condition}")
         
-        for pattern, condition_type in patterns_to_move:
-            match = re.search(pattern, having_clause, re.IGNORECASE)
-            if match:
-                condition = match.group(1)
-                # Check it's not inside an aggregate function
-                before = having_clause[:match.start()]
-                if not re.search(r'\b(SUM|COUNT|AVG|MAX|MIN)\s*\([^)]*$', before, re.IGNORECASE):
-                    moved_conditions.append((condition, match.start(), match.end()))
-                    self.logger.warning(f"🔧 Found {condition_type} condition in HAVING: {condition}")
-        
-        # Remove conditions from HAVING (in reverse order to preserve indices)
-        if moved_conditions:
-            new_having = having_clause
-            for condition, start, end in reversed(moved_conditions):
-                # Remove the condition and its leading AND
-                new_having = new_having[:start] + new_having[end:].strip()
-                # Clean up any double AND/OR
-                new_having = re.sub(r'\s+AND\s+AND\s+', ' AND ', new_having, flags=re.IGNORECASE)
-                new_having = re.sub(r'^\s+AND\s+', '', new_having, flags=re.IGNORECASE)
-            
-            # Reconstruct SQL with fixed HAVING
-            sql = sql[:having_start] + new_having + sql[having_end:]
-            
-            # Add conditions to WHERE
-            where_end_pos = group_by_match.start()
-            conditions_str = " AND ".join([cond for cond, _, _ in moved_conditions])
-            sql = sql[:where_end_pos].rstrip() + f" AND {conditions_str} " + sql[where_end_pos:]
-            self.logger.warning(f"✅ Moved {len(moved_conditions)} condition(s) from HAVING to WHERE")
+        if not moved_conditions:
+            # No conditions to move, return original SQL
             return sql
         
-        # No conditions to move, return original SQL
+        kept_parts.append(having_clause[last_end:])
+        new_having = "".join(kept_parts).strip()
+        new_having = _RE_DOUBLE_AND.sub(' AND ', new_having)
+        new_having = _RE_LEADING_AND.sub('', new_having)
+
+        # Reconstruct in one join: WHERE tail + moved conditions +
+        # GROUP BY..HAVING + rewritten clause + remainder. All offsets
+        # index the original string, so a single pass replaces the
+        # repeated full-copy slice splices.
+        where_end_pos = group_by_match.start()
+        conditions_str = " AND ".join(moved_conditions)
+        sql = "".join((
+            sql[:where_end_pos].rstrip(),
+            f" AND {conditions_str} ",
+            sql[where_end_pos:having_start],
+            new_having,
+            sql[having_end:],
+        ))
+        self.logger.warning(f"✅ Moved {len(moved_conditions)} condition(s) from HAVING to WHERE")
         return sql
 
 
+# Process-wide generator, created on first use (same pattern as the
+# executor singleton). Construction re-reads the API key from env and
+# resolves a logger - work that only needs doing once.
+_GENERATOR = None
+
+
 # Convenience function for LangGraph
 def sql_generator_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for SQL generation."""
-    node = SQLGenerator()
-    return node(state)
+    global _GENERATOR
+    if _GENERATOR is None:
+        _GENERATOR = SQLGenerator()
+    return _GENERATOR(state)
+
+
+async def asql_generator_node(state: WorkflowState) -> Dict[str, Any]:
+    """Async LangGraph node function for SQL generation (non-blocking)."""
+    global _GENERATOR
+    if _GENERATOR is None:
+        _GENERATOR = SQLGenerator()
+    return await _GENERATOR.acall(state)
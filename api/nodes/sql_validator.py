@@ -131,16 +131,19 @@ class SQLValidator:
                         non_aggregate_cols.append(match.group(0))
                 
                 # Check if any non-aggregate columns in HAVING are not in GROUP BY
+                # (lowercase the GROUP BY clause once, and each column once)
+                group_by_lower = group_by_cols.lower()
                 for col_match in non_aggregate_cols:
                     col = col_match[0] if col_match[0] else ""
                     col_name = col_match[1] if len(col_match) > 1 else ""
                     if col_name:
+                        col_name_lower = col_name.lower()
                         full_col = (col + col_name).lower()
                         # Check if this column is in GROUP BY
-                        if full_col not in group_by_cols.lower() and col_name.lower() not in ['and', 'or', 'not', 'in', 'between', 'like', 'is', 'null']:
+                        if full_col not in group_by_lower and col_name_lower not in ['and', 'or', 'not', 'in', 'between', 'like', 'is', 'null']:
                             # This might be an error, but be lenient - check if it's a common filter column
                             common_filter_cols = ['risk_level', 'age', 'gender', 'participation', 'status', 'is_active']
-                            if any(filter_col in col_name.lower() for filter_col in common_filter_cols):
+                            if any(filter_col in col_name_lower for filter_col in common_filter_cols):
                                 errors.append(
                                     f"Column '{col_name}' in HAVING clause should be in WHERE clause or GROUP BY. "
                                     f"Non-aggregated columns (like risk_level, age, participation flags) must be filtered in WHERE, not HAVING."
@@ -5,6 +5,7 @@ Includes LLM helpers, formatting, and common operations.
 from typing import List, Dict, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+import functools
 import json
 import re
 import os
@@ -31,10 +32,13 @@ def get_supervisor_llm():
     )
 
 
+@functools.lru_cache(maxsize=4)
 def get_main_llm(model_name: str = None):
     """
     Get the main LLM for conversation and complex tasks.
     Uses gpt-4o-mini for speed (can upgrade to gpt-4o for quality).
+    Cached per model so callers share one client per model (and its
+    HTTP connection pool).
     """
     api_key = config.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
     
@@ -156,16 +160,20 @@ def sanitize_sql(sql: str) -> str:
 
 def format_query_result(
     results: List[Dict[str, any]], 
-    max_rows: int = 10
+    max_rows: int = 10,
+    total_rows: int = None
 ) -> str:
     """
     Format query results for display or summarization.
     Truncates to avoid token bloat.
+
+    Pass total_rows when `results` is already a preview slice so the
+    row counts still reflect the full result set.
     """
     if not results:
         return "No results returned."
     
-    num_rows = len(results)
+    num_rows = total_rows if total_rows is not None else len(results)
     display_rows = results[:max_rows]
     
     # Get column names
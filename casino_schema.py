@@ -4,6 +4,43 @@ Casino Database Schema for the AI Workflow system.
 This schema represents a comprehensive casino operations database
 with tables for customers, transactions, gaming, and operations.
 """
+import functools
+import io
+import sys
+from dataclasses import dataclass
+from enum import IntEnum
+from types import MappingProxyType
+
+
+class Table(IntEnum):
+    """
+    Positional index of each casino table.
+
+    Matches the insertion order of CASINO_SCHEMA, so descriptors can be
+    fetched branch-free via _TABLE_DESCRIPTORS[Table.TRANSACTIONS]
+    instead of a dict lookup by name.
+    """
+    CUSTOMER = 0
+    CUSTOMER_BEHAVIORS = 1
+    TRANSACTIONS = 2
+    GAME_SESSIONS = 3
+    GAMING_EQUIPMENT = 4
+    SHIFTS = 5
+    EMPLOYEES = 6
+
+# Horizontal rules used by the prompt formatter
+_RULE = "-" * 70
+_DOUBLE_RULE = "=" * 70
+
+# Closed vocabulary of SQL type tags used in this schema. Every
+# column_types value is drawn from this mapping so duplicate tags share a
+# single interned string object (pointer-equal comparisons downstream).
+_TYPE_VOCAB = {t: sys.intern(t) for t in (
+    "TEXT", "VARCHAR", "INTEGER", "BIGINT", "REAL", "DECIMAL",
+    "TIMESTAMP", "DATE",
+    "VARCHAR(10)", "VARCHAR(20)", "VARCHAR(30)", "VARCHAR(50)", "VARCHAR(100)",
+    "DECIMAL(8,2)", "DECIMAL(10,2)",
+)}
 
 CASINO_SCHEMA = {
     "customer": {
@@ -12,24 +49,24 @@ CASINO_SCHEMA = {
         "schema_name": "marketing_casino",
         "full_table_name": "marketing_casino.customer",
         "columns": {
-            "customer_id": "TEXT - Unique identifier for each customer",
-            "customer_name": "VARCHAR - Customer full name",
-            "gender": "TEXT - Customer gender (Male/Female)",
-            "age": "REAL - Customer age in years",
-            "region": "TEXT - Geographic region (North, Center, Lisbon, Alentejo, Algarve, Azores, Madeira)",
-            "marital_status": "TEXT - Marital status (Single, Married, Divorced, Widowed)",
-            "employment_status": "TEXT - Employment status (Employee, Self-employed, Unemployed, Student, Other)",
-            "education_level": "TEXT - Education level (Primary, Secondary, Bachelor, Master, PhD)",
-            "household_income_adequacy": "TEXT - Household income adequacy",
-            "registration_date": "TIMESTAMP - Customer registration date",
-            "last_activity_date": "TIMESTAMP - Last customer activity date",
-            "total_deposits": "TEXT - Total customer deposits (convert to decimal)",
-            "total_withdrawals": "TEXT - Total customer withdrawals (convert to decimal)",
-            "net_balance": "TEXT - Customer net balance (convert to decimal)",
-            "risk_score": "BIGINT - Customer risk score 0-100"
+            "customer_id": ("TEXT", "Unique identifier for each customer"),
+            "customer_name": ("VARCHAR", "Customer full name"),
+            "gender": ("TEXT", "Customer gender (Male/Female)"),
+            "age": ("REAL", "Customer age in years"),
+            "region": ("TEXT", "Geographic region (North, Center, Lisbon, Alentejo, Algarve, Azores, Madeira)"),
+            "marital_status": ("TEXT", "Marital status (Single, Married, Divorced, Widowed)"),
+            "employment_status": ("TEXT", "Employment status (Employee, Self-employed, Unemployed, Student, Other)"),
+            "education_level": ("TEXT", "Education level (Primary, Secondary, Bachelor, Master, PhD)"),
+            "household_income_adequacy": ("TEXT", "Household income adequacy"),
+            "registration_date": ("TIMESTAMP", "Customer registration date"),
+            "last_activity_date": ("TIMESTAMP", "Last customer activity date"),
+            "total_deposits": ("TEXT", "Total customer deposits (convert to decimal)"),
+            "total_withdrawals": ("TEXT", "Total customer withdrawals (convert to decimal)"),
+            "net_balance": ("TEXT", "Customer net balance (convert to decimal)"),
+            "risk_score": ("BIGINT", "Customer risk score 0-100")
         },
         "use_cases": "Customer segmentation, demographic analysis, customer lifetime value calculation, geographic market analysis, risk-based customer management",
-        "record_count": "7,678"
+        "record_count": 7678
     },
     
     "customer_behaviors": {
@@ -38,27 +75,27 @@ CASINO_SCHEMA = {
         "schema_name": "marketing_casino",
         "full_table_name": "marketing_casino.customer_behaviors",
         "columns": {
-            "behavior_id": "BIGINT - Unique behavior record identifier",
-            "customer_id": "TEXT - Links to customer table",
-            "ever_bet_money": "BIGINT - Whether customer has ever bet money (0/1)",
-            "offline_gambling_participation": "BIGINT - Offline gambling participation (0/1)",
-            "online_gambling_participation": "BIGINT - Online gambling participation (0/1)",
-            "lifetime_gambling_occasions_offline": "REAL - Total lifetime offline gambling occasions",
-            "lifetime_gambling_occasions_online": "REAL - Total lifetime online gambling occasions",
-            "gambling_occasions_12months_offline": "REAL - Offline gambling occasions in last 12 months",
-            "gambling_occasions_12months_online": "REAL - Online gambling occasions in last 12 months",
-            "gambling_occasions_3months_offline": "REAL - Offline gambling occasions in last 3 months",
-            "gambling_occasions_3months_online": "REAL - Online gambling occasions in last 3 months",
-            "monthly_gambling_expenditure_offline": "REAL - Average monthly offline gambling expenditure",
-            "monthly_gambling_expenditure_online": "REAL - Average monthly online gambling expenditure",
-            "smartphone_usage_frequency": "REAL - Smartphone usage frequency",
-            "tablet_usage_frequency": "REAL - Tablet usage frequency",
-            "laptop_desktop_usage_frequency": "REAL - Laptop/desktop usage frequency",
-            "problem_gambling_score": "REAL - Problem gambling score",
-            "risk_level": "TEXT - Risk level (low/medium/high)"
+            "behavior_id": ("BIGINT", "Unique behavior record identifier"),
+            "customer_id": ("TEXT", "Links to customer table"),
+            "ever_bet_money": ("BIGINT", "Whether customer has ever bet money (0/1)"),
+            "offline_gambling_participation": ("BIGINT", "Offline gambling participation (0/1)"),
+            "online_gambling_participation": ("BIGINT", "Online gambling participation (0/1)"),
+            "lifetime_gambling_occasions_offline": ("REAL", "Total lifetime offline gambling occasions"),
+            "lifetime_gambling_occasions_online": ("REAL", "Total lifetime online gambling occasions"),
+            "gambling_occasions_12months_offline": ("REAL", "Offline gambling occasions in last 12 months"),
+            "gambling_occasions_12months_online": ("REAL", "Online gambling occasions in last 12 months"),
+            "gambling_occasions_3months_offline": ("REAL", "Offline gambling occasions in last 3 months"),
+            "gambling_occasions_3months_online": ("REAL", "Online gambling occasions in last 3 months"),
+            "monthly_gambling_expenditure_offline": ("REAL", "Average monthly offline gambling expenditure"),
+            "monthly_gambling_expenditure_online": ("REAL", "Average monthly online gambling expenditure"),
+            "smartphone_usage_frequency": ("REAL", "Smartphone usage frequency"),
+            "tablet_usage_frequency": ("REAL", "Tablet usage frequency"),
+            "laptop_desktop_usage_frequency": ("REAL", "Laptop/desktop usage frequency"),
+            "problem_gambling_score": ("REAL", "Problem gambling score"),
+            "risk_level": ("TEXT", "Risk level (low/medium/high)")
         },
         "use_cases": "Problem gambling identification, behavioral segmentation, risk assessment, responsible gambling initiatives",
-        "record_count": "1,993"
+        "record_count": 1993
     },
     
     "transactions": {
@@ -67,16 +104,16 @@ CASINO_SCHEMA = {
         "schema_name": "finance_casino",
         "full_table_name": "finance_casino.transactions",
         "columns": {
-            "transaction_id": "INTEGER - Unique transaction identifier",
-            "customer_id": "VARCHAR(50) - Links to customers table",
-            "req_time_utc": "TIMESTAMP - Transaction timestamp in UTC",
-            "transaction_type": "VARCHAR(30) - Type of transaction",
-            "transaction_amount": "TEXT - Transaction amount in USD you need to convert it to a decimal number",
-            "status": "VARCHAR(20) - Transaction status (APPROVED/DECLINED)",
-            "direction": "VARCHAR(10) - Transaction direction (IN/OUT)"
+            "transaction_id": ("INTEGER", "Unique transaction identifier"),
+            "customer_id": ("VARCHAR(50)", "Links to customers table"),
+            "req_time_utc": ("TIMESTAMP", "Transaction timestamp in UTC"),
+            "transaction_type": ("VARCHAR(30)", "Type of transaction"),
+            "transaction_amount": ("TEXT", "Transaction amount in USD you need to convert it to a decimal number"),
+            "status": ("VARCHAR(20)", "Transaction status (APPROVED/DECLINED)"),
+            "direction": ("VARCHAR(10)", "Transaction direction (IN/OUT)")
         },
         "use_cases": "Revenue tracking, fraud detection, payment method analysis, transaction approval rate monitoring, compliance reporting",
-        "record_count": "586,781"
+        "record_count": 586781
     },
     
     "game_sessions": {
@@ -85,17 +122,17 @@ CASINO_SCHEMA = {
         "schema_name": "operations_casino",
         "full_table_name": "operations_casino.game_sessions",
         "columns": {
-            "session_id": "INTEGER - Unique session identifier",
-            "game_id": "INTEGER - Game type identifier",
-            "customer_id": "VARCHAR(50) - Links to customers table",
-            "session_start_time": "TIMESTAMP - Session start timestamp",
-            "total_bets": "DECIMAL(10,2) - Total bets placed during session",
-            "total_wins": "DECIMAL(10,2) - Total wins earned during session",
-            "net_result": "DECIMAL(10,2) - Net result (wins - bets)",
-            "session_duration_minutes": "INTEGER - Session duration in minutes"
+            "session_id": ("INTEGER", "Unique session identifier"),
+            "game_id": ("INTEGER", "Game type identifier"),
+            "customer_id": ("VARCHAR(50)", "Links to customers table"),
+            "session_start_time": ("TIMESTAMP", "Session start timestamp"),
+            "total_bets": ("DECIMAL(10,2)", "Total bets placed during session"),
+            "total_wins": ("DECIMAL(10,2)", "Total wins earned during session"),
+            "net_result": ("DECIMAL(10,2)", "Net result (wins - bets)"),
+            "session_duration_minutes": ("INTEGER", "Session duration in minutes")
         },
         "use_cases": "Game performance analysis, session duration metrics, customer gaming behavior analysis, revenue per session calculations",
-        "record_count": "3,000"
+        "record_count": 3000
     },
     
     "gaming_equipment": {
@@ -104,14 +141,14 @@ CASINO_SCHEMA = {
         "schema_name": "operations_casino",
         "full_table_name": "operations_casino.gaming_equipment",
         "columns": {
-            "equipment_id": "INTEGER - Unique equipment identifier",
-            "equipment_name": "VARCHAR(100) - Equipment name",
-            "equipment_type": "VARCHAR(30) - Equipment type (table/machine/terminal)",
-            "status": "VARCHAR(20) - Equipment status (active/maintenance/inactive)",
-            "hourly_revenue": "DECIMAL(8,2) - Average hourly revenue"
+            "equipment_id": ("INTEGER", "Unique equipment identifier"),
+            "equipment_name": ("VARCHAR(100)", "Equipment name"),
+            "equipment_type": ("VARCHAR(30)", "Equipment type (table/machine/terminal)"),
+            "status": ("VARCHAR(20)", "Equipment status (active/maintenance/inactive)"),
+            "hourly_revenue": ("DECIMAL(8,2)", "Average hourly revenue")
         },
         "use_cases": "Equipment utilization tracking, maintenance scheduling, revenue per equipment analysis, capacity planning",
-        "record_count": "20"
+        "record_count": 20
     },
     
     "shifts": {
@@ -120,15 +157,15 @@ CASINO_SCHEMA = {
         "schema_name": "operations_casino",
         "full_table_name": "operations_casino.shifts",
         "columns": {
-            "shift_id": "INTEGER - Unique shift identifier",
-            "employee_id": "INTEGER - Links to employees table",
-            "equipment_id": "INTEGER - Links to gaming_equipment table",
-            "shift_start": "TIMESTAMP - Shift start timestamp",
-            "total_revenue": "DECIMAL(10,2) - Total revenue during shift",
-            "total_transactions": "INTEGER - Total transactions during shift"
+            "shift_id": ("INTEGER", "Unique shift identifier"),
+            "employee_id": ("INTEGER", "Links to employees table"),
+            "equipment_id": ("INTEGER", "Links to gaming_equipment table"),
+            "shift_start": ("TIMESTAMP", "Shift start timestamp"),
+            "total_revenue": ("DECIMAL(10,2)", "Total revenue during shift"),
+            "total_transactions": ("INTEGER", "Total transactions during shift")
         },
         "use_cases": "Employee productivity analysis, shift scheduling, performance-based compensation, workforce planning",
-        "record_count": "100"
+        "record_count": 100
     },
     
     "employees": {
@@ -137,77 +174,210 @@ CASINO_SCHEMA = {
         "schema_name": "hr_casino",
         "full_table_name": "hr_casino.employees",
         "columns": {
-            "employee_id": "INTEGER - Unique employee identifier",
-            "first_name": "VARCHAR(50) - Employee first name",
-            "last_name": "VARCHAR(50) - Employee last name",
-            "department": "VARCHAR(30) - Department (finance/marketing/operations/security)",
-            "position": "VARCHAR(50) - Job position",
-            "hire_date": "DATE - Employee hire date",
-            "salary": "DECIMAL(8,2) - Annual salary",
-            "is_active": "INTEGER - 0 or 1 Whether employee is active"
+            "employee_id": ("INTEGER", "Unique employee identifier"),
+            "first_name": ("VARCHAR(50)", "Employee first name"),
+            "last_name": ("VARCHAR(50)", "Employee last name"),
+            "department": ("VARCHAR(30)", "Department (finance/marketing/operations/security)"),
+            "position": ("VARCHAR(50)", "Job position"),
+            "hire_date": ("DATE", "Employee hire date"),
+            "salary": ("DECIMAL(8,2)", "Annual salary"),
+            "is_active": ("INTEGER", "0 or 1 Whether employee is active")
         },
         "use_cases": "Employee directory management, department staffing analysis, compensation planning, workforce development",
-        "record_count": "50"
+        "record_count": 50
     }
 }
 
+# Plain-dict view kept for serialization (MappingProxyType is not
+# JSON-serializable); everything else should go through CASINO_SCHEMA.
+_CASINO_SCHEMA_PLAIN = CASINO_SCHEMA
+
+# Freeze the schema (outer dict, table dicts, and columns dicts) so derived
+# data can be cached safely; attempted mutation now fails loudly.
+CASINO_SCHEMA = MappingProxyType({
+    name: MappingProxyType({**info, "columns": MappingProxyType(info["columns"])})
+    for name, info in CASINO_SCHEMA.items()
+})
+
+
+@dataclass(frozen=True, slots=True)
+class TableDescriptor:
+    """
+    Immutable descriptor for one casino table.
+
+    Attribute access is a slot read instead of a dict probe, and the
+    instance is far smaller than the equivalent dict.
+    """
+    catalog: str
+    schema: str
+    table: str
+    full_name: str
+    full_name_upper: str
+    columns: tuple
+    column_types: MappingProxyType
+    description: str
+    record_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class _TableMeta:
+    """Precomputed per-table metadata shared by both public formatters."""
+    names: tuple
+    types: MappingProxyType
+    columns_block: str
+    description_block: str
+    loader_dict: MappingProxyType
+    descriptor: TableDescriptor
+
+
+def _build_table_meta():
+    """
+    Single fused pass over CASINO_SCHEMA (runs once at import).
+
+    Produces both the rendered prompt block and the loader-format mapping
+    for each table, so neither public function re-iterates the columns.
+    """
+    metas = []
+
+    for table_name, table_info in CASINO_SCHEMA.items():
+        names = tuple(table_info['columns'].keys())
+        column_types = {}
+        rendered_lines = []
+
+        for col_name, (col_type, col_desc) in table_info['columns'].items():
+            # Type is stored pre-parsed - no string splitting needed.
+            # Draw the tag from the shared vocabulary (interning any type
+            # that is not yet in the closed set).
+            column_types[col_name] = _TYPE_VOCAB.get(col_type) or sys.intern(col_type)
+            rendered_lines.append(f"  - {col_name}: {col_type} - {col_desc}")
+
+        types = MappingProxyType(column_types)
+        columns_block = "\n".join(rendered_lines)
+
+        # Get schema name and full table name
+        schema_name = sys.intern(table_info.get('schema_name', 'public'))
+        full_table_name = table_info.get('full_table_name', table_name)
+        full_name_upper = full_table_name.upper()
+
+        description_block = (
+            f"\n{full_name_upper} ({table_info['record_count']:,} records)\n"
+            f"Department: {table_info['department']}\n"
+            f"Description: {table_info['description']}\n"
+            f"\nColumns:\n{columns_block}\n"
+            f"\nUse Cases: {table_info['use_cases']}\n"
+            + _RULE
+        )
+
+        descriptor = TableDescriptor(
+            catalog=schema_name,  # Use the schema as catalog
+            schema=schema_name,
+            table=table_name,
+            full_name=full_table_name,  # This is what will be used in queries
+            full_name_upper=full_name_upper,
+            columns=names,
+            column_types=types,
+            description=table_info['description'],
+            record_count=table_info['record_count'],
+        )
+
+        loader_dict = MappingProxyType({
+            "catalog": descriptor.catalog,
+            "schema": descriptor.schema,
+            "table": descriptor.table,
+            "full_name": descriptor.full_name,
+            "columns": descriptor.columns,
+            "column_types": descriptor.column_types,
+            "description": descriptor.description,
+            "record_count": descriptor.record_count
+        })
+
+        metas.append(_TableMeta(
+            names=names,
+            types=types,
+            columns_block=columns_block,
+            description_block=description_block,
+            loader_dict=loader_dict,
+            descriptor=descriptor,
+        ))
+
+    return metas
+
+
+# Precomputed once at import - the schema is constant, so rebuilding
+# the derived structures on every call is pure redundant work.
+_TABLES = tuple(_build_table_meta())
+_CASINO_TABLES = tuple(meta.loader_dict for meta in _TABLES)
+_TABLE_DESCRIPTORS = tuple(meta.descriptor for meta in _TABLES)
+
+# Keep the enum aligned with the schema's insertion order
+assert tuple(t.name.lower() for t in Table) == tuple(CASINO_SCHEMA)
+
+
+def get_table_descriptor(table: Table) -> TableDescriptor:
+    """Get one table's descriptor by its Table enum index (O(1) tuple access)."""
+    return _TABLE_DESCRIPTORS[table]
+
+
+def get_casino_table_descriptors():
+    """
+    Get the casino tables as TableDescriptor objects.
+
+    Preferred over get_casino_tables_for_schema_loader for new code:
+    attribute access is cheaper than dict lookups and the descriptors
+    are immutable. The dict-returning function remains for the schema
+    loader and other legacy callers.
+    """
+    return _TABLE_DESCRIPTORS
+
+
+@functools.lru_cache(maxsize=1)
 def get_casino_schema_description() -> str:
     """
     Get a formatted description of the casino database schema
     for inclusion in prompts.
+
+    The schema is a module-level constant, so the formatted text is
+    built once from the precomputed table blocks and cached. Writing into
+    a StringIO buffer keeps peak memory at roughly the final string size
+    rather than holding a full list of blocks alongside the join result.
     """
-    lines = ["CASINO DATABASE SCHEMA:"]
-    lines.append("="*70)
-    
-    for table_name, table_info in CASINO_SCHEMA.items():
-        full_name = table_info.get('full_table_name', table_name)
-        lines.append(f"\n{full_name.upper()} ({table_info['record_count']} records)")
-        lines.append(f"Department: {table_info['department']}")
-        lines.append(f"Description: {table_info['description']}")
-        lines.append("\nColumns:")
-        for col_name, col_desc in table_info['columns'].items():
-            lines.append(f"  - {col_name}: {col_desc}")
-        lines.append(f"\nUse Cases: {table_info['use_cases']}")
-        lines.append("-"*70)
-    
-    return "\n".join(lines)
+    buf = io.StringIO()
+    buf.write("CASINO DATABASE SCHEMA:\n")
+    buf.write(_DOUBLE_RULE)
+    for meta in _TABLES:
+        buf.write("\n")
+        buf.write(meta.description_block)
+    return buf.getvalue()
 
 
 def get_casino_tables_for_schema_loader():
     """
     Convert casino schema to format compatible with schema loader.
-    
+
     Uses the proper schema prefixes for each table group:
     - hr_casino for employees
-    - marketing_casino for customers, customer_behaviors  
+    - marketing_casino for customers, customer_behaviors
     - operations_casino for game_sessions, gaming_equipment, shifts
     - finance_casino for transactions
+
+    Returns a precomputed, immutable tuple of read-only table mappings.
     """
-    tables = []
-    
-    for table_name, table_info in CASINO_SCHEMA.items():
-        # Extract column names and types
-        columns = list(table_info['columns'].keys())
-        column_types = {}
-        
-        for col_name, col_desc in table_info['columns'].items():
-            # Extract type from description (before the dash)
-            col_type = col_desc.split(' - ')[0] if ' - ' in col_desc else 'VARCHAR'
-            column_types[col_name] = col_type
-        
-        # Get schema name and full table name
-        schema_name = table_info.get('schema_name', 'public')
-        full_table_name = table_info.get('full_table_name', table_name)
-        
-        tables.append({
-            "catalog": schema_name,  # Use the schema as catalog
-            "schema": schema_name,
-            "table": table_name,
-            "full_name": full_table_name,  # This is what will be used in queries
-            "columns": columns,
-            "column_types": column_types,
-            "description": table_info['description']
-        })
-    
-    return tables
+    return _CASINO_TABLES
+
+
+# Compact wire form of the schema, serialized once at import so
+# network-bound consumers can send the bytes without re-serializing the
+# dict on every request.
+try:
+    import orjson
+    CASINO_SCHEMA_JSON_BYTES = orjson.dumps(_CASINO_SCHEMA_PLAIN)
+except ImportError:
+    import json
+    CASINO_SCHEMA_JSON_BYTES = json.dumps(
+        _CASINO_SCHEMA_PLAIN, separators=(',', ':')
+    ).encode()
+
 
+def get_casino_schema_json_bytes() -> bytes:
+    """Get the casino schema pre-serialized as compact JSON bytes."""
+    return CASINO_SCHEMA_JSON_BYTES
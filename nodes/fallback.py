@@ -7,6 +7,9 @@ Triggered when:
 - Query validation fails
 - SQL generation produces invalid results
 """
+import functools
+import re
+from collections import OrderedDict
 from typing import Dict, Any
 from langchain_core.messages import SystemMessage, HumanMessage
 from state import WorkflowState
@@ -14,6 +17,61 @@ from utils import get_main_llm, format_conversation_history, truncate_history
 from config import config
 from logging_config import get_logger, log_node_entry, log_node_exit
 
+# Bound once at import - logging.getLogger is a lock + dict lookup we
+# don't need to repeat per instance
+_LOGGER = get_logger("ai_workflow.fallback")
+
+# Static system prompt, hoisted so every request sends a byte-identical
+# prefix. The per-request reason/context lives in the user message, so
+# the provider's automatic prompt caching can reuse the prefill for this
+# block across calls.
+_CLARIFIER_SYSTEM_PROMPT = """You are a helpful assistant that asks clarifying questions.
+
+The user's query was unclear or couldn't be processed.
+
+Your task:
+1. Ask ONE specific clarifying question, OR
+2. Suggest a rephrased version of their query
+
+Be helpful and guide them toward a successful query.
+
+Keep your response concise (2-3 sentences)."""
+
+# Vague queries repeat heavily in real traffic; a bounded LRU keyed on
+# the deterministic inputs turns repeat clarifications into dict lookups
+_CLARIFICATION_CACHE_MAX = 1024
+
+
+def _normalize_input(user_input: str) -> str:
+    """Collapse whitespace and case so trivially-different repeats hit the cache."""
+    return re.sub(r"\s+", " ", user_input.strip().lower())
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cheap_llm():
+    """Cheap-tier client for trivial clarifications (shared, pooled)."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=config.MAIN_TEMPERATURE,
+        max_tokens=config.MAIN_MAX_TOKENS,
+        api_key=config.OPENAI_API_KEY,
+    )
+
+
+def _select_clarifier_llm(reason: str, logger):
+    """
+    Most clarifications ("what did you mean?") are trivial and go to the
+    cheap tier; error explanations keep the main model. Falls back to
+    the main LLM when no OpenAI key is configured.
+    """
+    if config.OPENAI_API_KEY and reason in ("unclear", "low_confidence"):
+        logger.info(f"Clarifier tier: gpt-4o-mini (reason={reason})")
+        return _get_cheap_llm()
+    logger.info(f"Clarifier tier: main model (reason={reason})")
+    return get_main_llm()
+
 
 class FallbackClarifier:
     """
@@ -25,7 +83,9 @@ class FallbackClarifier:
     
     def __init__(self):
         self.llm = get_main_llm()
-        self.logger = get_logger("ai_workflow.fallback")
+        self.logger = _LOGGER
+        # (reason, normalized input) -> clarification text, LRU-evicted
+        self._clarification_cache = OrderedDict()
     
     def __call__(self, state: WorkflowState) -> Dict[str, Any]:
         """
@@ -39,10 +99,12 @@ class FallbackClarifier:
         """
         log_node_entry(self.logger, "FallbackClarifier", state)
         
-        user_input = state.get("user_input", "")
-        conversation_history = state.get("conversation_history", [])
-        schema_cache = state.get("schema_cache", {})
-        error_message = state.get("error_message", "")
+        # Bind the method once - LOAD_FAST per lookup instead of LOAD_ATTR
+        get = state.get
+        user_input = get("user_input", "")
+        conversation_history = get("conversation_history", [])
+        schema_cache = get("schema_cache", {})
+        error_message = get("error_message", "")
         
         # Determine why we're in fallback
         reason = self._determine_fallback_reason(state)
@@ -59,21 +121,58 @@ class FallbackClarifier:
             schema_cache=schema_cache,
             history=truncate_history(conversation_history, max_messages=2)
         )
-        
+
         updates = {
             "response": response,
             "current_node": "fallback"
         }
-        
+
         log_node_exit(self.logger, "FallbackClarifier", updates)
         return updates
-    
+
+    async def acall(self, state: WorkflowState) -> Dict[str, Any]:
+        """
+        Async counterpart of __call__. Awaiting the LLM instead of
+        blocking lets concurrent graph runs overlap their network waits.
+        """
+        log_node_entry(self.logger, "FallbackClarifier", state)
+
+        # Bind the method once - LOAD_FAST per lookup instead of LOAD_ATTR
+        get = state.get
+        user_input = get("user_input", "")
+        conversation_history = get("conversation_history", [])
+        schema_cache = get("schema_cache", {})
+        error_message = get("error_message", "")
+
+        reason = self._determine_fallback_reason(state)
+        self.logger.info(f"Fallback triggered - reason: {reason}")
+
+        if error_message:
+            self.logger.warning(f"Error that triggered fallback: {error_message}")
+
+        response = await self._agenerate_clarification(
+            user_input=user_input,
+            reason=reason,
+            error_message=error_message,
+            schema_cache=schema_cache,
+            history=truncate_history(conversation_history, max_messages=2)
+        )
+
+        updates = {
+            "response": response,
+            "current_node": "fallback"
+        }
+
+        log_node_exit(self.logger, "FallbackClarifier", updates)
+        return updates
+
     def _determine_fallback_reason(self, state: WorkflowState) -> str:
         """Determine why we ended up in fallback state."""
-        confidence = state.get("confidence", 1.0)
-        validation_result = state.get("validation_result", {})
-        feasibility_check = state.get("feasibility_check", {})
-        error_message = state.get("error_message", "")
+        get = state.get
+        confidence = get("confidence", 1.0)
+        validation_result = get("validation_result", {})
+        feasibility_check = get("feasibility_check", {})
+        error_message = get("error_message", "")
         
         if error_message:
             return "error"
@@ -86,68 +185,122 @@ class FallbackClarifier:
         else:
             return "unclear"
     
-    def _generate_clarification(
+    def _build_clarification_messages(
         self,
         user_input: str,
         reason: str,
         error_message: str,
         schema_cache: Dict[str, Any],
         history: list
-    ) -> str:
-        """Generate a helpful clarification message."""
-        
+    ):
+        """Build the LLM messages and the table list for suggestions."""
+
         # Build context based on why we're asking for clarification
         context_info = []
-        
+
         if error_message:
             context_info.append(f"Error encountered: {error_message}")
-        
+
         if reason == "infeasible_query":
             context_info.append("The requested query cannot be fulfilled with available tables.")
-        
+
         # Get available tables for suggestions
         available_tables = []
         if schema_cache and "tables" in schema_cache:
             tables = schema_cache["tables"]
             available_tables = [t.get("table", "") for t in tables[:10]]
-        
+
         if available_tables:
             context_info.append(f"Available tables: {', '.join(available_tables)}")
-        
-        system_prompt = f"""You are a helpful assistant that asks clarifying questions.
 
-The user's query was unclear or couldn't be processed.
+        messages = [SystemMessage(content=_CLARIFIER_SYSTEM_PROMPT)]
 
-Reason: {reason}
+        # Add minimal history
+        if history:
+            messages.extend(format_conversation_history(history))
 
-Your task:
-1. Ask ONE specific clarifying question, OR
-2. Suggest a rephrased version of their query
+        # Dynamic details (reason, context) go at the end of the user
+        # message so the static system prefix stays cacheable
+        messages.append(HumanMessage(content=(
+            f"User query: {user_input}\n\n"
+            f"Reason: {reason}\n\n"
+            f"Context:\n{chr(10).join(context_info) if context_info else 'None'}"
+        )))
 
-Be helpful and guide them toward a successful query.
+        return messages, available_tables
+
+    def _generate_clarification(
+        self,
+        user_input: str,
+        reason: str,
+        error_message: str,
+        schema_cache: Dict[str, Any],
+        history: list
+    ) -> str:
+        """Generate a helpful clarification message."""
+        cache_key = (reason, _normalize_input(user_input))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
-Context:
-{chr(10).join(context_info) if context_info else 'None'}
+        messages, available_tables = self._build_clarification_messages(
+            user_input, reason, error_message, schema_cache, history
+        )
 
-Keep your response concise (2-3 sentences)."""
-        
         try:
-            messages = [SystemMessage(content=system_prompt)]
-            
-            # Add minimal history
-            if history:
-                messages.extend(format_conversation_history(history))
-            
-            # Add current query
-            messages.append(HumanMessage(content=f"User query: {user_input}"))
-            
-            response = self.llm.invoke(messages)
-            return response.content.strip()
-            
+            llm = _select_clarifier_llm(reason, self.logger)
+            response = llm.invoke(messages)
+            clarification = response.content.strip()
+            self._cache_put(cache_key, clarification)
+            return clarification
+
+        except Exception as e:
+            # Fallback to generic clarification
+            return self._generic_clarification(user_input, available_tables)
+
+    async def _agenerate_clarification(
+        self,
+        user_input: str,
+        reason: str,
+        error_message: str,
+        schema_cache: Dict[str, Any],
+        history: list
+    ) -> str:
+        """Async variant of _generate_clarification (awaits the LLM)."""
+        cache_key = (reason, _normalize_input(user_input))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        messages, available_tables = self._build_clarification_messages(
+            user_input, reason, error_message, schema_cache, history
+        )
+
+        try:
+            llm = _select_clarifier_llm(reason, self.logger)
+            response = await llm.ainvoke(messages)
+            clarification = response.content.strip()
+            self._cache_put(cache_key, clarification)
+            return clarification
+
         except Exception as e:
             # Fallback to generic clarification
             return self._generic_clarification(user_input, available_tables)
     
+    def _cache_get(self, key):
+        """LRU lookup: a hit is moved to the most-recent end."""
+        cached = self._clarification_cache.get(key)
+        if cached is not None:
+            self._clarification_cache.move_to_end(key)
+            self.logger.info("Clarification cache hit - LLM skipped")
+        return cached
+
+    def _cache_put(self, key, clarification: str) -> None:
+        """Store a successful LLM clarification, evicting the oldest entry."""
+        self._clarification_cache[key] = clarification
+        if len(self._clarification_cache) > _CLARIFICATION_CACHE_MAX:
+            self._clarification_cache.popitem(last=False)
+
     def _generic_clarification(self, user_input: str, available_tables: list) -> str:
         """Generate a generic clarification when LLM fails."""
         base_message = "I'm not quite sure what you're looking for. Could you please be more specific?"
@@ -160,9 +313,24 @@ Keep your response concise (2-3 sentences)."""
         return base_message
 
 
+# Process-wide clarifier, created on first use (same pattern as the
+# executor singleton)
+_FALLBACK = None
+
+
 # Convenience function for LangGraph
 def fallback_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for fallback."""
-    node = FallbackClarifier()
-    return node(state)
+    global _FALLBACK
+    if _FALLBACK is None:
+        _FALLBACK = FallbackClarifier()
+    return _FALLBACK(state)
+
+
+async def afallback_node(state: WorkflowState) -> Dict[str, Any]:
+    """Async LangGraph node function for fallback (non-blocking LLM)."""
+    global _FALLBACK
+    if _FALLBACK is None:
+        _FALLBACK = FallbackClarifier()
+    return await _FALLBACK.acall(state)
 
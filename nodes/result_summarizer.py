@@ -4,15 +4,226 @@ Result Summarizer - Summarizes query results efficiently.
 Generates concise summaries without raw data dumps.
 Token-efficient (≤ 150 tokens).
 """
+import asyncio
+import functools
+import json
+import logging
+import re
 from typing import Dict, Any, List
 from langchain_core.messages import SystemMessage, HumanMessage
 from state import WorkflowState
-from utils import get_main_llm, format_query_result
+from utils import get_main_llm
 from config import config
 from logging_config import get_logger, log_node_entry, log_node_exit
 import time
 
 
+# Cost-aware model tiers: almost everything runs on the cheap tier; only
+# genuinely complex results (multiple joins/aggregates over wide data)
+# justify the strong model's latency and price.
+_CHEAP_MODEL = "gpt-4o-mini"
+_STRONG_MODEL = "gpt-4o"
+
+
+@functools.lru_cache(maxsize=2)
+def _get_summarizer_llm(model: str = _CHEAP_MODEL):
+    """
+    Build one ChatOpenAI per tier. Reusing the instances shares their
+    HTTP connection pools across requests instead of paying a fresh
+    client build (and TCP+TLS handshake) per summarization.
+    """
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        temperature=0.7,
+        max_tokens=300
+    )
+
+
+# Only this many rows ever reach a prompt or the basic formatter;
+# slicing up front keeps large result sets out of the hot path
+_PREVIEW_ROWS = 5
+
+# SQL constructs whose results usually need interpretation; plain
+# SELECT/WHERE output reads fine from the deterministic formatter
+_SQL_COMPLEXITY_RE = re.compile(
+    r"\b(?:GROUP\s+BY|JOIN|HAVING|AVG|SUM|COUNT|MIN|MAX)\b", re.IGNORECASE
+)
+
+
+def _sql_complexity(sql: str) -> int:
+    """Count aggregate/join constructs in the SQL as a complexity score."""
+    return len(_SQL_COMPLEXITY_RE.findall(sql)) if sql else 0
+
+
+def _toon_format(results: List[Dict[str, Any]], total_rows: int) -> str:
+    """
+    Compact tabular serialization for prompts: one header line plus
+    pipe-separated value rows. JSON-style previews repeat every key per
+    row; emitting each column name once shaves a third or more of the
+    preview's input tokens. Floats are pre-rounded to 2 decimals.
+    """
+    if not results:
+        return "No results returned."
+    lines = ["|".join(results[0].keys())]
+    for row in results:
+        lines.append("|".join(
+            f"{v:.2f}" if isinstance(v, float) else ("" if v is None else str(v))
+            for v in row.values()
+        ))
+    lines.append(f"({total_rows} rows total)")
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=512)
+def _nice_col(name: str) -> str:
+    """Title-cased display name for a column, cached across requests."""
+    return name.replace('_', ' ').title()
+
+
+def _formatter_for(sample_value):
+    """Pick a per-column cell formatter from a sample value."""
+    if isinstance(sample_value, float):
+        return lambda v: "N/A" if v is None else f"{v:,.2f}"
+    return lambda v: "N/A" if v is None else str(v)
+
+
+def _all_scalar_columns(row: Dict[str, Any]) -> bool:
+    """True when every value in the row is a flat scalar (no nesting)."""
+    return all(not isinstance(v, (dict, list)) for v in row.values())
+
+# Static system prompt, hoisted to a module constant so every request
+# sends a byte-identical prefix. OpenAI's automatic prompt caching keys
+# on identical leading tokens, so keeping the static rules first (and
+# the per-query question/data in the user message) maximizes prefix
+# cache hits and cuts prefill latency on repeat calls.
+_SUMMARIZER_SYSTEM_PROMPT = """You are a data analyst presenting query results.
+
+FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
+
+📊 **Results Summary**
+Found X results. Here are the highlights:
+
+**Top Results:**
+1. [Name/ID]: [Key metric] - [Other relevant info]
+2. [Name/ID]: [Key metric] - [Other relevant info]
+3. [Name/ID]: [Key metric] - [Other relevant info]
+
+**Key Insights:**
+• [One interesting observation about the data]
+• [Another insight if relevant]
+
+RULES:
+- Use numbered lists for data, NOT markdown tables with pipes (|)
+- Keep each data point on ONE line
+- Round numbers to 2 decimal places
+- For names, show "FirstName LastName" format
+- Maximum 5-7 highlighted results, then summarize the rest
+- Be concise but informative"""
+
+
+
+class _SummaryBatcher:
+    """
+    Micro-batches concurrent summarization calls into one chat completion.
+
+    Requests arriving within a short window share a single prompt, which
+    amortizes the HTTP round-trip and the system-prompt prefill across
+    the batch. Only the async path uses this; failures propagate so the
+    caller can fall back to a normal single-request summary.
+    """
+
+    MAX_BATCH = 6
+    MAX_WAIT = 0.025  # seconds to hold the first request for company
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.logger = get_logger("ai_workflow.result_summarizer")
+        self._pending = []  # (user_input, row_count, result_preview, future)
+        self._lock = asyncio.Lock()
+        self._timer = None
+
+    async def summarize(
+        self, user_input: str, results: List[Dict[str, Any]], total_rows: int
+    ) -> str:
+        """Enqueue one summarization and await its slice of the batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        preview = _toon_format(results, total_rows)
+
+        async with self._lock:
+            self._pending.append((user_input, total_rows, preview, future))
+            if len(self._pending) >= self.MAX_BATCH:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch, self._pending = self._pending, []
+                loop.create_task(self._flush(batch))
+            elif len(self._pending) == 1:
+                self._timer = loop.create_task(self._flush_after_wait())
+
+        return await future
+
+    async def _flush_after_wait(self):
+        await asyncio.sleep(self.MAX_WAIT)
+        async with self._lock:
+            self._timer = None
+            batch, self._pending = self._pending, []
+        await self._flush(batch)
+
+    async def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            summaries = await self._summarize_batch(batch)
+            for (_, _, _, future), summary in zip(batch, summaries):
+                if not future.done():
+                    future.set_result(summary)
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _summarize_batch(self, batch) -> List[str]:
+        """One LLM call for the whole batch; returns one summary per item."""
+        items = "\n\n".join(
+            f"{i}) Question: {user_input}\nData returned ({row_count} rows):\n{preview}"
+            for i, (user_input, row_count, preview, _) in enumerate(batch, 1)
+        )
+        prompt = (
+            f"Summarize each of the following {len(batch)} query results "
+            f"independently, following the format rules. Return ONLY a JSON "
+            f"array of {len(batch)} strings, one summary per item, in order.\n\n"
+            f"{items}"
+        )
+        response = await self.llm.ainvoke([
+            SystemMessage(content=_SUMMARIZER_SYSTEM_PROMPT),
+            HumanMessage(content=prompt)
+        ])
+        content = response.content.strip()
+        if content.startswith("```"):
+            content = content.strip("`")
+            if content.startswith("json"):
+                content = content[4:]
+        summaries = json.loads(content)
+        if not isinstance(summaries, list) or len(summaries) != len(batch):
+            raise ValueError(f"Expected {len(batch)} summaries, got {summaries!r:.200}")
+        self.logger.info(f"Batched {len(batch)} summarizations into one LLM call")
+        return [str(s).strip() for s in summaries]
+
+
+# Shared batcher, created lazily on first use (needs a running loop)
+_BATCHER = None
+
+
+def _get_batcher(llm) -> _SummaryBatcher:
+    global _BATCHER
+    if _BATCHER is None:
+        _BATCHER = _SummaryBatcher(llm)
+    return _BATCHER
+
+
 class ResultSummarizer:
     """
     Summarizes query results in natural language.
@@ -22,16 +233,10 @@ class ResultSummarizer:
     """
     
     def __init__(self):
-        # Use faster model for summarization (gpt-4o-mini is 10x faster)
-        from langchain_openai import ChatOpenAI
-        from config import config
-        
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",  # Faster and cheaper than gpt-4o
-            temperature=0.7,
-            max_tokens=300
-        )
+        self.llm = _get_summarizer_llm()
         self.logger = get_logger("ai_workflow.result_summarizer")
+        # Observability: how often the deterministic fast path avoided an LLM call
+        self._fast_path_hits = 0
     
     def __call__(self, state: WorkflowState) -> Dict[str, Any]:
         """
@@ -46,29 +251,35 @@ class ResultSummarizer:
         log_node_entry(self.logger, "ResultSummarizer", state)
         start_time = time.time()
         
-        user_input = state.get("user_input", "")
-        query_result = state.get("query_result", [])
-        generated_sql = state.get("generated_sql", "")
+        # Bind the method once - LOAD_FAST per lookup instead of LOAD_ATTR
+        get = state.get
+        user_input = get("user_input", "")
+        query_result = get("query_result", [])
+        generated_sql = get("generated_sql", "")
         
         row_count = len(query_result) if query_result else 0
         self.logger.info(f"Summarizing {row_count} rows for user")
         
-        # Log the actual results for debugging
+        # Log the actual results for debugging (repr of rows is O(row
+        # size) - only pay for it when DEBUG is actually emitted)
         if query_result:
-            self.logger.info("="*70)
-            self.logger.info("QUERY RESULTS TO SUMMARIZE:")
-            self.logger.info("="*70)
-            for i, row in enumerate(query_result[:5], 1):
-                self.logger.info(f"Row {i}: {row}")
-            if len(query_result) > 5:
-                self.logger.info(f"... and {len(query_result) - 5} more rows")
-            self.logger.info("="*70)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("="*70)
+                self.logger.debug("QUERY RESULTS TO SUMMARIZE:")
+                self.logger.debug("="*70)
+                for i, row in enumerate(query_result[:5], 1):
+                    self.logger.debug(f"Row {i}: {row}")
+                if row_count > 5:
+                    self.logger.debug(f"... and {row_count - 5} more rows")
+                self.logger.debug("="*70)
         else:
             self.logger.warning("No results to summarize - query_result is empty or None")
             self.logger.debug(f"query_result type: {type(query_result)}, value: {query_result}")
         
-        # Generate summary
-        response = self._summarize_results(user_input, query_result, generated_sql)
+        # Generate summary (preview slice + scalar count; the helpers
+        # never need the full list)
+        preview = query_result[:_PREVIEW_ROWS] if query_result else []
+        response = self._summarize_results(user_input, preview, row_count, generated_sql)
         
         execution_time = time.time() - start_time
         self.logger.info(f"Summary generated in {execution_time:.3f}s")
@@ -78,109 +289,251 @@ class ResultSummarizer:
             "current_node": "result_summarizer"
         }
         
+        # Exit logging serializes only the update keys; the response body
+        # itself is visible at DEBUG, truncated so the slice is the cost
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("response=%s", response[:200])
         log_node_exit(self.logger, "ResultSummarizer", updates)
         return updates
     
+    async def acall(self, state: WorkflowState) -> Dict[str, Any]:
+        """
+        Async counterpart of __call__. Awaiting the LLM instead of
+        blocking lets concurrent graph runs overlap their network waits.
+        """
+        log_node_entry(self.logger, "ResultSummarizer", state)
+        start_time = time.time()
+        
+        # Bind the method once - LOAD_FAST per lookup instead of LOAD_ATTR
+        get = state.get
+        user_input = get("user_input", "")
+        query_result = get("query_result", [])
+        generated_sql = get("generated_sql", "")
+        
+        row_count = len(query_result) if query_result else 0
+        self.logger.info(f"Summarizing {row_count} rows for user")
+        
+        preview = query_result[:_PREVIEW_ROWS] if query_result else []
+        response = await self._asummarize_results(user_input, preview, row_count, generated_sql)
+        
+        execution_time = time.time() - start_time
+        self.logger.info(f"Summary generated in {execution_time:.3f}s")
+        
+        updates = {
+            "response": response,
+            "current_node": "result_summarizer"
+        }
+        
+        # Exit logging serializes only the update keys; the response body
+        # itself is visible at DEBUG, truncated so the slice is the cost
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("response=%s", response[:200])
+        log_node_exit(self.logger, "ResultSummarizer", updates)
+        return updates
+    
+    def _select_llm(self, results: List[Dict[str, Any]], total_rows: int, sql: str):
+        """
+        Route the request to a model tier by result complexity.
+
+        Cheap tier handles the bulk; the strong model is reserved for
+        heavily aggregated/joined results over wide or large sets. The
+        decision is logged for offline hit-rate analysis.
+        """
+        complexity = _sql_complexity(sql)
+        num_columns = len(results[0]) if results else 0
+        if complexity >= 3 or (complexity >= 2 and (total_rows > 100 or num_columns > 6)):
+            model = _STRONG_MODEL
+        else:
+            model = _CHEAP_MODEL
+        self.logger.info(
+            f"Summarizer tier: {model} (complexity={complexity}, rows={total_rows}, cols={num_columns})"
+        )
+        return _get_summarizer_llm(model)
+    
     def _summarize_results(
         self,
         user_input: str,
         results: List[Dict[str, Any]],
+        total_rows: int,
         sql: str
     ) -> str:
         """Generate a concise summary of the results."""
         
         if not results:
-            return "The query executed successfully but returned no results."
-        
-        # Fast path: For simple "show me" queries, use basic summary
-        simple_keywords = ['show', 'list', 'get', 'give', 'display']
-        if any(keyword in user_input.lower() for keyword in simple_keywords) and len(results) <= 10:
-            return self._basic_summary(results, user_input)
+            return self._no_results_response()
         
-        # Format results for context
-        result_preview = format_query_result(results, max_rows=5)
+        # Fast path: small flat result sets from simple SQL format fine
+        # deterministically - skip the LLM round-trip entirely
+        if (total_rows <= config.FAST_PATH_ROW_LIMIT
+                and _all_scalar_columns(results[0])
+                and _sql_complexity(sql) < config.LLM_SUMMARY_MIN_COMPLEXITY):
+            self._fast_path_hits += 1
+            self.logger.info(f"Summary fast path hit ({self._fast_path_hits} total) - LLM skipped")
+            return self._basic_summary(results, user_input, total_rows)
         
-        system_prompt = f"""You are a data analyst presenting query results.
-
-FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
-
-📊 **Results Summary**
-Found X results. Here are the highlights:
-
-**Top Results:**
-1. [Name/ID]: [Key metric] - [Other relevant info]
-2. [Name/ID]: [Key metric] - [Other relevant info]
-3. [Name/ID]: [Key metric] - [Other relevant info]
-
-**Key Insights:**
-• [One interesting observation about the data]
-• [Another insight if relevant]
+        messages = self._build_summary_messages(user_input, results, total_rows)
+        llm = self._select_llm(results, total_rows, sql)
 
-RULES:
-- Use numbered lists for data, NOT markdown tables with pipes (|)
-- Keep each data point on ONE line
-- Round numbers to 2 decimal places
-- For names, show "FirstName LastName" format
-- Maximum 5-7 highlighted results, then summarize the rest
-- Be concise but informative"""
+        try:
+            response = llm.invoke(messages)
+            summary = response.content.strip()
+            
+            # Add row count context
+            if total_rows >= config.MAX_RESULT_ROWS:
+                summary += f"\n\n(Showing first {config.MAX_RESULT_ROWS} results)"
+            
+            return summary
+            
+        except Exception as e:
+            # Fallback to basic summary
+            return self._basic_summary(results, user_input, total_rows)
+    
+    async def _asummarize_results(
+        self,
+        user_input: str,
+        results: List[Dict[str, Any]],
+        total_rows: int,
+        sql: str
+    ) -> str:
+        """Async variant of _summarize_results (awaits the LLM)."""
         
-        user_message = f"""Question: {user_input}
-
-Data returned ({len(results)} rows):
-{result_preview}
-
-Summarize this data clearly using numbered lists (NOT tables with | characters)."""
+        if not results:
+            return self._no_results_response()
+        
+        # Fast path: small flat result sets from simple SQL format fine
+        # deterministically - skip the LLM round-trip entirely
+        if (total_rows <= config.FAST_PATH_ROW_LIMIT
+                and _all_scalar_columns(results[0])
+                and _sql_complexity(sql) < config.LLM_SUMMARY_MIN_COMPLEXITY):
+            self._fast_path_hits += 1
+            self.logger.info(f"Summary fast path hit ({self._fast_path_hits} total) - LLM skipped")
+            return self._basic_summary(results, user_input, total_rows)
         
+        if config.SUMMARIZER_BATCH_ENABLED:
+            try:
+                summary = await _get_batcher(self.llm).summarize(user_input, results, total_rows)
+                if total_rows >= config.MAX_RESULT_ROWS:
+                    summary += f"\n\n(Showing first {config.MAX_RESULT_ROWS} results)"
+                return summary
+            except Exception:
+                # Batch failed (parse error, timeout, ...) - fall through
+                # to the normal single-request path below
+                self.logger.warning("Batched summarization failed, using single call", exc_info=True)
+        
+        messages = self._build_summary_messages(user_input, results, total_rows)
+        llm = self._select_llm(results, total_rows, sql)
+
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_message)
-            ]
-            
-            response = self.llm.invoke(messages)
+            response = await llm.ainvoke(messages)
             summary = response.content.strip()
             
             # Add row count context
-            if len(results) >= config.MAX_RESULT_ROWS:
+            if total_rows >= config.MAX_RESULT_ROWS:
                 summary += f"\n\n(Showing first {config.MAX_RESULT_ROWS} results)"
             
             return summary
             
         except Exception as e:
             # Fallback to basic summary
-            return self._basic_summary(results, user_input)
+            return self._basic_summary(results, user_input, total_rows)
+    
+    async def astream_summary(
+        self,
+        user_input: str,
+        results: List[Dict[str, Any]],
+        total_rows: int,
+        sql: str
+    ):
+        """
+        Stream the summary as text deltas (async generator).
+
+        Deterministic paths (no results, fast path) yield their full text
+        as one chunk; the LLM path yields tokens as they arrive, so a
+        streaming client sees first output after one token period instead
+        of waiting for the whole completion. Callers assemble the final
+        response for logging/history themselves.
+        """
+        if not results:
+            yield self._no_results_response()
+            return
+        
+        if (total_rows <= config.FAST_PATH_ROW_LIMIT
+                and _all_scalar_columns(results[0])
+                and _sql_complexity(sql) < config.LLM_SUMMARY_MIN_COMPLEXITY):
+            self._fast_path_hits += 1
+            self.logger.info(f"Summary fast path hit ({self._fast_path_hits} total) - LLM skipped")
+            yield self._basic_summary(results, user_input, total_rows)
+            return
+        
+        messages = self._build_summary_messages(user_input, results, total_rows)
+        llm = self._select_llm(results, total_rows, sql)
+        emitted = False
+        try:
+            async for chunk in llm.astream(messages):
+                if chunk.content:
+                    emitted = True
+                    yield chunk.content
+            if total_rows >= config.MAX_RESULT_ROWS:
+                yield f"\n\n(Showing first {config.MAX_RESULT_ROWS} results)"
+        except Exception:
+            # Nothing reached the client yet - degrade to the basic summary
+            if not emitted:
+                yield self._basic_summary(results, user_input, total_rows)
+    
+    @staticmethod
+    def _no_results_response() -> str:
+        """Response for a query that returned zero rows."""
+        return "The query executed successfully but returned no results."
+    
+    def _build_summary_messages(
+        self, user_input: str, results: List[Dict[str, Any]], total_rows: int
+    ) -> List:
+        """Build the summarization prompt (shared by sync/async paths)."""
+        # Format results for context (compact header+rows table)
+        result_preview = _toon_format(results, total_rows)
+        
+        user_message = f"""Question: {user_input}
+
+Data returned ({total_rows} rows):
+{result_preview}
+
+Summarize this data clearly using numbered lists (NOT tables with | characters)."""
+        
+        return [
+            SystemMessage(content=_SUMMARIZER_SYSTEM_PROMPT),
+            HumanMessage(content=user_message)
+        ]
     
-    def _basic_summary(self, results: List[Dict[str, Any]], user_input: str) -> str:
-        """Generate a basic summary when LLM fails."""
-        num_rows = len(results)
+    def _basic_summary(
+        self, results: List[Dict[str, Any]], user_input: str, total_rows: int = None
+    ) -> str:
+        """Generate a basic summary when LLM fails.
+
+        `results` may be just a preview slice; pass total_rows so the
+        headline count covers the full result set.
+        """
+        num_rows = total_rows if total_rows is not None else len(results)
         
         if num_rows == 0:
             return "No results found."
         
-        columns = list(results[0].keys()) if results else []
-        
-        # Create a nice formatted summary
-        summary = f"📊 **Found {num_rows} result{'s' if num_rows != 1 else ''}**\n\n"
-        
-        # Show all rows if 10 or fewer, otherwise show first 5
-        rows_to_show = min(num_rows, 5)
-        
-        for i, row in enumerate(results[:rows_to_show], 1):
-            # Create a one-line summary for each row
-            parts = []
-            for key, value in row.items():
-                # Format the key nicely
-                nice_key = key.replace('_', ' ').title()
-                # Format the value
-                if isinstance(value, float):
-                    formatted_val = f"{value:,.2f}"
-                elif value is None:
-                    formatted_val = "N/A"
-                else:
-                    formatted_val = str(value)
-                parts.append(f"{nice_key}: {formatted_val}")
-            
-            summary += f"{i}. {' | '.join(parts[:4])}\n"  # Limit to first 4 columns per line
+        # Column plan computed once from the first row: title-cased header
+        # plus a cell formatter per column (first 4 columns per line, as
+        # before) - the schema work is done once instead of per cell
+        first_row = results[0]
+        plan = [
+            (key, _nice_col(key), _formatter_for(first_row[key]))
+            for key in list(first_row.keys())[:4]
+        ]
+        
+        # Show at most the preview slice we hold
+        rows_to_show = min(num_rows, _PREVIEW_ROWS, len(results))
+        
+        body = "\n".join(
+            f"{i}. {' | '.join(f'{header}: {fmt(row.get(key))}' for key, header, fmt in plan)}"
+            for i, row in enumerate(results[:rows_to_show], 1)
+        )
+        summary = f"📊 **Found {num_rows} result{'s' if num_rows != 1 else ''}**\n\n{body}\n"
         
         if num_rows > rows_to_show:
             summary += f"\n... and {num_rows - rows_to_show} more results"
@@ -188,9 +541,24 @@ Summarize this data clearly using numbered lists (NOT tables with | characters).
         return summary
 
 
+# Process-wide summarizer, created on first use (same pattern as the
+# executor singleton)
+_SUMMARIZER = None
+
+
 # Convenience function for LangGraph
 def result_summarizer_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for result summarization."""
-    node = ResultSummarizer()
-    return node(state)
+    global _SUMMARIZER
+    if _SUMMARIZER is None:
+        _SUMMARIZER = ResultSummarizer()
+    return _SUMMARIZER(state)
+
+
+async def aresult_summarizer_node(state: WorkflowState) -> Dict[str, Any]:
+    """Async LangGraph node function for summarization (non-blocking LLM)."""
+    global _SUMMARIZER
+    if _SUMMARIZER is None:
+        _SUMMARIZER = ResultSummarizer()
+    return await _SUMMARIZER.acall(state)
 
@@ -44,8 +44,9 @@ class SchemaFeasibilityChecker:
         log_node_entry(self.logger, "SchemaFeasibilityChecker", state)
         start_time = time.time()
         
-        user_input = state.get("user_input", "")
-        schema_cache = state.get("schema_cache", {})
+        get = state.get
+        user_input = get("user_input", "")
+        schema_cache = get("schema_cache", {})
         
         self.logger.info(f"Checking feasibility for query: '{user_input[:100]}...'")
         
@@ -195,9 +196,16 @@ Can this query be answered with the available schema?"""
         return "\n".join(lines)
 
 
+# Process-wide checker, created on first use (same pattern as the
+# executor singleton)
+_CHECKER = None
+
+
 # Convenience function for LangGraph
 def schema_feasibility_node(state: WorkflowState) -> Dict[str, Any]:
     """LangGraph node function for schema feasibility checking."""
-    node = SchemaFeasibilityChecker()
-    return node(state)
+    global _CHECKER
+    if _CHECKER is None:
+        _CHECKER = SchemaFeasibilityChecker()
+    return _CHECKER(state)
 
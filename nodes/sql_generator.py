@@ -188,9 +188,11 @@ Generate the SQL query."""
         relevant_tables = []
         
         for table_name in table_names:
+            # Lowercase once per requested table, not once per comparison
+            table_name_lower = table_name.lower()
             for table in all_tables:
-                if (table_name.lower() in table.get("table", "").lower() or
-                    table_name.lower() in table.get("full_name", "").lower()):
+                if (table_name_lower in table.get("table", "").lower() or
+                    table_name_lower in table.get("full_name", "").lower()):
                     relevant_tables.append(table)
                     break
         
@@ -174,9 +174,11 @@ class SQLValidator:
             # This is simplified - production would use SQL parser
             selected_cols = [col.strip().split()[-1] for col in select_clause.split(",")]
             
-            # Check if any expected columns are missing
+            # Check if any expected columns are missing (lowercase the SQL
+            # once instead of re-materializing it per expected column)
+            sql_lower = sql.lower()
             for expected in expected_columns:
-                if expected.lower() not in sql.lower():
+                if expected.lower() not in sql_lower:
                     warnings.append(f"Expected column '{expected}' not found in query")
         
         return warnings
@@ -7,6 +7,7 @@ from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from config import config
+import functools
 import json
 import re
 
@@ -24,10 +25,12 @@ def get_supervisor_llm():
     )
 
 
+@functools.lru_cache(maxsize=1)
 def get_main_llm():
     """
     Get the main LLM for conversation and complex tasks.
-    Uses gpt-4o or Claude for better quality.
+    Uses gpt-4o or Claude for better quality. Cached so every caller
+    shares one client (and its HTTP connection pool).
     """
     if config.OPENAI_API_KEY:
         return ChatOpenAI(
@@ -153,16 +156,20 @@ def sanitize_sql(sql: str) -> str:
 
 def format_query_result(
     results: List[Dict[str, any]], 
-    max_rows: int = 10
+    max_rows: int = 10,
+    total_rows: int = None
 ) -> str:
     """
     Format query results for display or summarization.
     Truncates to avoid token bloat.
+
+    Pass total_rows when `results` is already a preview slice so the
+    row counts still reflect the full result set.
     """
     if not results:
         return "No results returned."
     
-    num_rows = len(results)
+    num_rows = total_rows if total_rows is not None else len(results)
     display_rows = results[:max_rows]
     
     # Get column names
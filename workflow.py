@@ -4,6 +4,7 @@ LangGraph Workflow Construction and Routing Logic.
 This module builds the complete workflow graph with all nodes and edges,
 implementing the routing logic between execution paths.
 """
+import re
 from typing import Literal
 from langgraph.graph import StateGraph, END
 from state import WorkflowState
@@ -23,6 +24,22 @@ from nodes import (
 # Module-level logger
 logger = get_logger("ai_workflow.routing")
 
+# Routing keywords compiled once: one C-level scan over the input per
+# decision instead of a Python-level substring search per keyword.
+# Deliberately no \b anchors - these match as substrings ('employe'
+# covers employee/employees), same as the old `in` checks.
+_DATA_KW_RE = re.compile(
+    "|".join(map(re.escape, [
+        'show', 'list', 'get', 'find', 'employe', 'customer',
+        'transaction', 'revenue', 'salary', 'risk', 'session',
+        'equipment', 'shift', 'how many', 'average', 'total',
+    ]))
+)
+# startswith covers the equality case too (p == input implies prefix)
+_CONV_ONLY_PREFIXES = (
+    'hello', 'hi', 'hey', 'thank', 'bye', 'help me understand', 'what can you',
+)
+
 
 def route_from_supervisor(state: WorkflowState) -> str:
     """
@@ -35,14 +52,10 @@ def route_from_supervisor(state: WorkflowState) -> str:
     user_input = state.get("user_input", "").lower()
     
     # FAILSAFE: Check for data keywords in user input
-    data_keywords = ['show', 'list', 'get', 'find', 'employe', 'customer', 
-                     'transaction', 'revenue', 'salary', 'risk', 'session',
-                     'equipment', 'shift', 'how many', 'average', 'total']
-    has_data_keyword = any(kw in user_input for kw in data_keywords)
-    
+    has_data_keyword = _DATA_KW_RE.search(user_input) is not None
+
     # Pure conversation patterns
-    conv_only = ['hello', 'hi', 'hey', 'thank', 'bye', 'help me understand', 'what can you']
-    is_pure_conversation = any(user_input.startswith(p) or user_input == p for p in conv_only)
+    is_pure_conversation = user_input.startswith(_CONV_ONLY_PREFIXES)
     
     # Routing decision
     if has_data_keyword and not is_pure_conversation: